@@ -0,0 +1,199 @@
+"""Headless HTTP API for research jobs, for services that drive research without the UI.
+
+    POST /jobs                       submit a job (same spec fields as batch_research.py) -> 202 {"id", "status"}
+    GET  /jobs/{id}                  poll the job status
+    GET  /jobs/{id}/result           research data and drafted response once the job is done
+    GET  /jobs/{id}/export/{format}  the report rendered as pdf or docx
+    GET  /health                     queue statistics and OpenRouter status
+
+Submissions beyond API_MAX_QUEUE waiting jobs are rejected with 429. Point
+TAVILY_API_BASE_URL and OPENROUTER_BASE_URL at local stand-ins to run it offline.
+
+    python api_server.py --port 8080
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+from collections import OrderedDict
+
+from aiohttp import web
+
+from main import arun_research
+from batch_research import normalize_spec
+from report_exports import EXPORT_RENDERERS, export_report
+from openrouter_health import openrouter_health
+
+# Research runs in flight, jobs allowed to wait for a slot, and finished jobs kept for polling
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "4"))
+API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "32"))
+API_MAX_FINISHED_JOBS = int(os.getenv("API_MAX_FINISHED_JOBS", "1000"))
+
+EXPORT_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+class JobManager:
+    """Runs research jobs on the event loop with bounded concurrency and queue depth."""
+
+    def __init__(self, max_concurrency: int = API_MAX_CONCURRENCY, max_queue: int = API_MAX_QUEUE,
+                 max_finished: int = API_MAX_FINISHED_JOBS):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.tasks = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def count(self, status: str) -> int:
+        return sum(1 for job in self.jobs.values() if job["status"] == status)
+
+    def submit(self, spec: dict) -> dict:
+        """Validate and enqueue a job; raises ValueError for a bad spec and OverflowError when the queue is full."""
+        kwargs = normalize_spec(spec)
+        if self.count("queued") >= self.max_queue:
+            raise OverflowError(f"queue is full ({self.max_queue} jobs waiting)")
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "params": kwargs,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "research": None,
+            "response": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self.tasks[job_id] = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: dict):
+        try:
+            async with self._slots:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                research_data, response = await arun_research(**job["params"], run_id=job["id"])
+            if not research_data or response.startswith(("Workflow failed", "Error")):
+                job.update(status="failed", error=response)
+            else:
+                job.update(status="done", research=research_data, response=response)
+        except asyncio.CancelledError:
+            job.update(status="failed", error="cancelled")
+            raise
+        except Exception as e:
+            logging.error(f"API job {job['id']} failed: {str(e)}")
+            job.update(status="failed", error=f"{type(e).__name__} - {str(e)}")
+        finally:
+            job["finished_at"] = time.time()
+            self.tasks.pop(job["id"], None)
+            self._prune()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished."""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    async def close(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+def job_status(job: dict) -> dict:
+    """Public view of a job, without its (potentially large) results."""
+    status = {key: job[key] for key in ("id", "status", "submitted_at", "started_at", "finished_at", "error")}
+    status["query"] = job["params"]["query"]
+    status["deep_research"] = job["params"]["deep_research"]
+    return status
+
+def get_job(request: web.Request) -> dict:
+    job = request.app["jobs"].jobs.get(request.match_info["job_id"])
+    if job is None:
+        raise web.HTTPNotFound(text='{"error": "unknown job"}', content_type="application/json")
+    return job
+
+def get_finished_job(request: web.Request) -> dict:
+    job = get_job(request)
+    if job["status"] != "done":
+        raise web.HTTPConflict(text=f'{{"error": "job is {job["status"]}"}}', content_type="application/json")
+    return job
+
+async def submit_job(request: web.Request) -> web.Response:
+    try:
+        spec = await request.json()
+        if not isinstance(spec, dict):
+            raise ValueError("request body must be a JSON object")
+        job = request.app["jobs"].submit(spec)
+    except OverflowError as e:
+        return web.json_response({"error": str(e)}, status=429, headers={"Retry-After": "5"})
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response({"id": job["id"], "status": job["status"]}, status=202)
+
+async def get_status(request: web.Request) -> web.Response:
+    return web.json_response(job_status(get_job(request)))
+
+async def get_result(request: web.Request) -> web.Response:
+    job = get_finished_job(request)
+    return web.json_response({**job_status(job), "research": job["research"], "response": job["response"]})
+
+async def get_export(request: web.Request) -> web.Response:
+    export_format = request.match_info["export_format"]
+    if export_format not in EXPORT_RENDERERS:
+        return web.json_response({"error": f"unsupported export format: {export_format}"}, status=404)
+    job = get_finished_job(request)
+    params = job["params"]
+    # Rendering is CPU-bound, so keep it off the event loop
+    content = await asyncio.get_running_loop().run_in_executor(
+        None, export_report, export_format, params["query"], job["research"], job["response"], params["deep_research"]
+    )
+    return web.Response(
+        body=content,
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="research_report_{job["id"]}.{export_format}"'}
+    )
+
+async def get_health(request: web.Request) -> web.Response:
+    jobs = request.app["jobs"]
+    return web.json_response({
+        "openrouter": openrouter_health.status(),
+        "queued": jobs.count("queued"),
+        "running": jobs.count("running"),
+        "max_concurrency": jobs.max_concurrency,
+        "max_queue": jobs.max_queue,
+    })
+
+def create_app(max_concurrency: int = API_MAX_CONCURRENCY, max_queue: int = API_MAX_QUEUE) -> web.Application:
+    """Build the aiohttp application (also used to run it in-process, e.g. with aiohttp's test client)."""
+    app = web.Application()
+
+    async def start_jobs(app):
+        app["jobs"] = JobManager(max_concurrency, max_queue)
+
+    async def stop_jobs(app):
+        await app["jobs"].close()
+
+    app.on_startup.append(start_jobs)
+    app.on_cleanup.append(stop_jobs)
+    app.add_routes([
+        web.post("/jobs", submit_job),
+        web.get("/jobs/{job_id}", get_status),
+        web.get("/jobs/{job_id}/result", get_result),
+        web.get("/jobs/{job_id}/export/{export_format}", get_export),
+        web.get("/health", get_health),
+    ])
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve research jobs over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=API_MAX_CONCURRENCY)
+    parser.add_argument("--max-queue", type=int, default=API_MAX_QUEUE)
+    args = parser.parse_args()
+    web.run_app(create_app(args.max_concurrency, args.max_queue), host=args.host, port=args.port)
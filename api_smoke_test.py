@@ -0,0 +1,132 @@
+"""Smoke test of the research API against local Tavily/OpenRouter stand-ins (no API quota used).
+
+Starts the stand-ins, serves api_server in-process with aiohttp's test client and
+checks every endpoint and its error paths: job submission and polling, results and
+exports of a finished job, 400 for malformed specs, 404 for unknown jobs and export
+formats, 409 for results of an unfinished job and 429 once the queue is full.
+Exits non-zero if any check fails.
+
+    python api_smoke_test.py --port 8799
+"""
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+from benchmark_stand_ins import StandInProcess
+from benchmark_pipeline import configure_environment, free_port
+
+JOB_TIMEOUT = 120
+
+class Checks:
+    """Collects check results so one failure does not hide the rest."""
+
+    def __init__(self):
+        self.failures = []
+
+    def expect(self, name: str, condition: bool, detail=""):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}" + (f" ({detail})" if detail and not condition else ""))
+        if not condition:
+            self.failures.append(name)
+
+async def wait_for_job(client, job_id: str) -> dict:
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while True:
+        status = await (await client.get(f"/jobs/{job_id}")).json()
+        if status["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return status
+        await asyncio.sleep(0.2)
+
+async def exercise_api(checks: Checks):
+    from aiohttp.test_utils import TestClient, TestServer
+    import api_server
+
+    # One slot and one waiting job, so a burst of submissions overflows the queue
+    app = api_server.create_app(max_concurrency=1, max_queue=1)
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/health")
+        health = await response.json()
+        checks.expect("GET /health -> 200", response.status == 200 and health["max_queue"] == 1, health)
+
+        bad_specs = {
+            "invalid JSON": b"{not json",
+            "non-object body": b'["query"]',
+            "missing query": b'{"word_count": 300}',
+            "non-string query": b'{"query": 5}',
+            "null word_count": b'{"query": "x", "word_count": null}',
+            "non-numeric word_count": b'{"query": "x", "word_count": "abc"}',
+            "zero word_count": b'{"query": "x", "word_count": 0}',
+            "non-boolean deep_research": b'{"query": "x", "deep_research": "yes"}',
+            "non-string style": b'{"query": "x", "style": 3}',
+        }
+        for name, body in bad_specs.items():
+            response = await client.post("/jobs", data=body, headers={"Content-Type": "application/json"})
+            payload = await response.json()
+            checks.expect(f"POST /jobs {name} -> 400", response.status == 400 and "error" in payload, (response.status, payload))
+
+        job_ids = []
+        statuses = []
+        for query in ("api smoke alpha", "api smoke beta", "api smoke gamma", "api smoke delta"):
+            response = await client.post("/jobs", json={"query": query, "word_count": 300})
+            statuses.append(response.status)
+            if response.status == 202:
+                job_ids.append((await response.json())["id"])
+            elif response.status == 429:
+                checks.expect("429 carries Retry-After", "Retry-After" in response.headers, dict(response.headers))
+                break
+        checks.expect("POST /jobs -> 202", bool(statuses) and statuses[0] == 202, statuses)
+        checks.expect("POST /jobs beyond the queue -> 429", 429 in statuses, statuses)
+        if not job_ids:
+            return
+        job_id = job_ids[0]
+
+        response = await client.get(f"/jobs/{job_id}/result")
+        checks.expect("GET result of an unfinished job -> 409", response.status == 409, response.status)
+
+        statuses = [await wait_for_job(client, submitted) for submitted in job_ids]
+        checks.expect("submitted jobs finish", all(status["status"] == "done" for status in statuses),
+                      [(status["status"], status["error"]) for status in statuses])
+
+        response = await client.get(f"/jobs/{job_id}/result")
+        result = await response.json()
+        checks.expect("GET /jobs/{id}/result -> 200", response.status == 200 and bool(result.get("research"))
+                      and bool(result.get("response")), response.status)
+
+        for export_format, content_type in api_server.EXPORT_CONTENT_TYPES.items():
+            response = await client.get(f"/jobs/{job_id}/export/{export_format}")
+            content = await response.read()
+            checks.expect(f"GET export/{export_format} -> 200", response.status == 200 and content
+                          and response.headers.get("Content-Type") == content_type, (response.status, len(content)))
+
+        response = await client.get(f"/jobs/{job_id}/export/txt")
+        checks.expect("GET unsupported export format -> 404", response.status == 404, response.status)
+        for path in ("/jobs/unknown", "/jobs/unknown/result", "/jobs/unknown/export/pdf"):
+            response = await client.get(path)
+            checks.expect(f"GET {path} -> 404", response.status == 404, response.status)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Smoke test the research API against local stand-ins.")
+    parser.add_argument("--port", type=int, default=0, help="stand-in port (default: a free port)")
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in latency in seconds (default: 0.3)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="api-smoke-")
+    stand_ins = StandInProcess(args.port or free_port(), latency=args.latency, token_rate=0, completion_tokens=120)
+    try:
+        configure_environment(stand_ins.base_url, workdir)
+        checks = Checks()
+        asyncio.run(exercise_api(checks))
+    finally:
+        stand_ins.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if checks.failures:
+        print(f"{len(checks.failures)} check(s) failed: {', '.join(checks.failures)}", file=sys.stderr)
+        return 1
+    print("All API checks passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,10 @@
 import streamlit as st
-from main import run_research  
-from draft_agent import format_citation, STYLE_TEMPLATES  
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
-import io
-import requests
-import datetime
+from draft_agent import format_citation, STYLE_TEMPLATES, clean_think_tags
+from report_exports import export_report
+from openrouter_health import check_openrouter_status, openrouter_health
+from background_jobs import background_jobs
 import logging
-import re
-from docx import Document
-from docx.shared import Pt, Inches
+from functools import partial
 
 # Set up logging
 logging.basicConfig(filename="research_agent.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -22,8 +14,10 @@ logging.basicConfig(filename="research_agent.log", level=logging.INFO, format="%
 DEFAULTS = {
     "research_data": None,
     "response": None,
-    "pdf_buffer": None,
-    "word_buffer": None,
+    "report": None,
+    "report_query": None,
+    "report_deep_research": False,
+    "active_job_id": None,
     "writing_style": "Academic",
     "language": "English",
     "citation_format": "APA",
@@ -543,319 +537,17 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 
-# Function to check OpenRouter status
-def check_openrouter_status():
-    """Check if OpenRouter API is operational."""
-    try:
-        response = requests.get("https://openrouter.ai/api/v1/models", timeout=5)
-        return response.status_code == 200
-    except Exception as e:
-        logging.error(f"Failed to check OpenRouter status: {str(e)}")
-        return False
-
-# Function to add page numbers to the PDF
-def on_page(canvas, doc):
-    page_num = canvas.getPageNumber()
-    text = f"Page {page_num}"
-    canvas.saveState()
-    canvas.setFont('Helvetica', 8)
-    canvas.setFillColor(colors.grey)
-    canvas.drawRightString(doc.rightMargin + doc.width, doc.bottomMargin - 10, text)
-    canvas.restoreState()
-
-def format_reference_for_pdf(ref_text):
-    """Format a single reference for PDF."""
-    # Extract date and URL using regex
-    date_match = re.search(r'\(([0-9]{4},\s*[^)]+)\)', ref_text)
-    url_match = re.search(r'Retrieved from\s+(https?://\S+)', ref_text)
-    
-    if date_match and url_match:
-        date = date_match.group(1)
-        url = url_match.group(1)
-        return f"({date}). Retrieved from {url}"
-    return ref_text
-
-def preprocess_references(refs_section):
-    """Preprocess references to ensure proper formatting."""
-    # Split references by looking for date pattern and "Retrieved from"
-    pattern = r'(?=\([0-9]{4},.*?\).*?Retrieved from)'
-    refs = re.split(pattern, refs_section)
-    # Clean up each reference
-    refs = [ref.strip() for ref in refs if ref.strip()]
-    
-    formatted_refs = []
-    for i, ref in enumerate(refs, 1):
-        # Split URL if it's broken across lines
-        ref = re.sub(r'(?<=https?://\S+)-\s*\n\s*(?=\S+)', '', ref)
-        # Remove any "Page X" artifacts
-        ref = re.sub(r'Page \d+\s*', '', ref)
-        # Clean up extra whitespace
-        ref = ' '.join(ref.split())
-        formatted_ref = format_reference_for_pdf(ref, i)
-        formatted_refs.append(formatted_ref)
-    
-    return formatted_refs
-
-def format_references_section(refs_text):
-    """Format references by adding line breaks after URLs."""
-    # Split by "Retrieved from" to separate different references
-    refs = refs_text.split("Retrieved from")
-    formatted_refs = []
-    
-    for i, ref in enumerate(refs):
-        if i == 0:  # First part might be empty
-            continue
-            
-        # Find the URL pattern
-        url_match = re.search(r'(https?://\S+)', ref)
-        if url_match:
-            url = url_match.group(1)
-            # Get the text before the URL (title part)
-            title_part = ref[:url_match.start()].strip()
-            if i > 0 and formatted_refs:  # Add the previous title
-                formatted_refs[-1] += f"Retrieved from {url}\n\n"
-            formatted_refs.append(title_part)
-    
-    # Handle the last URL
-    if formatted_refs and url_match:
-        formatted_refs[-1] += f"Retrieved from {url}\n\n"
-    
-    return "".join(formatted_refs)
-
-# Function to generate PDF with proper formatting and cover page
-def generate_pdf(query, data, summary, deep_research=False):
-    """Generate a PDF report with query, data, and summary in a research paper format."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        topMargin=72,
-        bottomMargin=72,
-        leftMargin=72,
-        rightMargin=72
-    )
-    styles = getSampleStyleSheet()
-
-    # Customize styles for a research paper look
-    styles['Title'].fontSize = 16
-    styles['Title'].spaceAfter = 12
-    styles['Heading2'].fontSize = 14
-    styles['Heading2'].spaceAfter = 6
-    styles['Heading3'].fontSize = 12
-    styles['Heading3'].spaceAfter = 6
-    styles['BodyText'].fontSize = 10
-    styles['BodyText'].leading = 14
-    styles['BodyText'].spaceAfter = 12
-
-    # Add a custom style for references
-    styles.add(ParagraphStyle(
-        name='Reference',
-        parent=styles['BodyText'],
-        fontSize=10,
-        leftIndent=36,
-        firstLineIndent=-36,
-        spaceAfter=12
-    ))
-
-    story = []
-
-    # Cover Page
-    story.append(Paragraph("Deep Research AI Agent Report", styles['Title']))
-    story.append(Spacer(1, 24))
-    story.append(Paragraph(f"Query: {query}", styles['Normal']))
-    story.append(Paragraph(f"Date: {datetime.date.today().strftime('%B %d, %Y')}", styles['Normal']))
-    story.append(Paragraph(f"Author: [Your Name]", styles['Normal']))
-    story.append(Spacer(1, 48))
-
-    # Metadata
-    story.append(Paragraph(f"OpenRouter Status: {'Operational' if check_openrouter_status() else 'Down'}", styles['Normal']))
-    story.append(Spacer(1, 12))
-    mode = "Deep Research" if deep_research else "Quick Research"
-    story.append(Paragraph(f"Mode: {mode}", styles['Normal']))
-    story.append(Spacer(1, 12))
-
-    # Research Summary Section
-    story.append(Paragraph("Research Summary", styles['Heading2']))
-    story.append(Spacer(1, 12))
-
-    # Add research data summary
-    for item in data:
-        story.append(Paragraph(f"• {item['title']}", styles['Heading3']))
-        story.append(Paragraph(item['content'], styles['BodyText']))
-        story.append(Spacer(1, 12))
-
-    # Process the content sections
-    sections = summary.split("\n\n")
-    references = []
-    current_heading = None
-    
-    for section in sections:
-        if section.startswith("**") and section.endswith("**"):
-            current_heading = section.strip("**").rstrip(":")
-            if current_heading == "References":
-                continue
-            story.append(Paragraph(current_heading, styles['Heading2']))
-            story.append(Spacer(1, 12))
-        else:
-            if current_heading == "References":
-                # Collect references for later processing
-                refs = section.split("\n")
-                for ref in refs:
-                    if ref.strip():
-                        references.append(ref.strip())
-            elif current_heading:
-                if current_heading == "Analysis":
-                    # Split into smaller paragraphs for readability
-                    sentences = re.split(r'(?<=[.!?])\s+', section)
-                    new_paragraphs = []
-                    current_paragraph = []
-                    sentence_count = 0
-                    
-                    max_sentences = 4 if len(sentences) < 15 else 6
-                    
-                    for sentence in sentences:
-                        current_paragraph.append(sentence)
-                        sentence_count += 1
-                        if sentence_count >= max_sentences:
-                            new_paragraphs.append(' '.join(current_paragraph))
-                            current_paragraph = []
-                            sentence_count = 0
-                    
-                    if current_paragraph:
-                        new_paragraphs.append(' '.join(current_paragraph))
-                    
-                    for paragraph in new_paragraphs:
-                        if paragraph.strip():
-                            story.append(Paragraph(paragraph.strip(), styles['BodyText']))
-                            story.append(Spacer(1, 12))
-                elif current_heading == "Key Findings":
-                    findings = re.split(r'(?=\d+\.)', section)
-                    for finding in findings:
-                        if finding.strip():
-                            story.append(Paragraph(finding.strip(), styles['BodyText']))
-                            story.append(Spacer(1, 6))
-                else:
-                    formatted_text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", section)
-                    formatted_text = formatted_text.replace("**", "")
-                    story.append(Paragraph(formatted_text, styles['BodyText']))
-                    story.append(Spacer(1, 12))
-
-    # Add References section at the end
-    if references:
-        story.append(Paragraph("References", styles['Heading2']))
-        story.append(Spacer(1, 12))
-        
-        for i, ref in enumerate(references, 1):
-            formatted_ref = format_reference_for_pdf(ref)
-            if formatted_ref:
-                ref_para = Paragraph(
-                    f"{i}. {formatted_ref}",
-                    styles['Reference']
-                )
-                story.append(ref_para)
-
-    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
-    buffer.seek(0)
-    return buffer
-
-# Function to generate Word document
-def generate_docx(query, data, summary, deep_research=False):
-    """Generate a Word document with query, data, and summary."""
-    doc = Document()
-    doc.add_heading("Deep Research AI Agent Report", 0)
-    doc.add_paragraph(f"Query: {query}")
-    doc.add_paragraph(f"Date: {datetime.date.today().strftime('%B %d, %Y')}")
-    doc.add_paragraph(f"Author: [Your Name]")
-    doc.add_paragraph(f"OpenRouter Status: {'Operational' if check_openrouter_status() else 'Down'}")
-    doc.add_paragraph(f"Mode: {'Deep Research' if deep_research else 'Quick Research'}")
-    
-    # Research Summary Section
-    doc.add_heading("Research Summary", level=1)
-    for item in data:
-        p = doc.add_paragraph()
-        p.add_run(f"• {item['title']}").bold = True
-        doc.add_paragraph(item['content'])
-        doc.add_paragraph(f"Source: {item['url']}")
-        doc.add_paragraph()  # Add spacing
-
-    # Process other sections
-    sections = summary.split("\n\n")
-    current_heading = None
-    references = []
-    
-    for section in sections:
-        if section.startswith("**") and section.endswith("**"):
-            current_heading = section.strip("**").rstrip(":")
-            if current_heading != "References":
-                doc.add_heading(current_heading, level=2)
-        else:
-            if current_heading == "References":
-                # Collect references for later processing
-                refs = section.split("\n")
-                for ref in refs:
-                    if ref.strip():
-                        references.append(ref.strip())
-            elif current_heading == "Analysis":
-                # Split into smaller paragraphs for readability
-                sentences = re.split(r'(?<=[.!?])\s+', section)
-                new_paragraphs = []
-                current_paragraph = []
-                sentence_count = 0
-                
-                max_sentences = 4 if len(sentences) < 15 else 6
-                
-                for sentence in sentences:
-                    current_paragraph.append(sentence)
-                    sentence_count += 1
-                    if sentence_count >= max_sentences:
-                        new_paragraphs.append(' '.join(current_paragraph))
-                        current_paragraph = []
-                        sentence_count = 0
-                
-                if current_paragraph:
-                    new_paragraphs.append(' '.join(current_paragraph))
-                
-                for paragraph in new_paragraphs:
-                    if paragraph.strip():
-                        p = doc.add_paragraph(paragraph.strip())
-                        p.paragraph_format.space_after = Pt(12)
-            elif current_heading == "Key Findings":
-                findings = re.split(r'(?=\d+\.)', section)
-                for finding in findings:
-                    if finding.strip():
-                        p = doc.add_paragraph(finding.strip())
-                        p.paragraph_format.space_after = Pt(6)
-            else:
-                formatted_text = re.sub(r"\*\*(.*?)\*\*", r"\1", section)
-                p = doc.add_paragraph(formatted_text)
-                p.paragraph_format.space_after = Pt(12)
-
-    # Add References section at the end
-    if references:
-        doc.add_heading("References", level=2)
-        
-        for i, ref in enumerate(references, 1):
-            formatted_ref = format_reference_for_pdf(ref)
-            if formatted_ref:
-                p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Inches(0.5)
-                p.paragraph_format.first_line_indent = Inches(-0.5)
-                p.paragraph_format.space_after = Pt(12)
-                p.add_run(f"{i}. {formatted_ref}")
-
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer
-
 # Streamlit app setup
 st.title("AI agent-based Deep Research")
 st.write("Enter a query to research and get a detailed response using Tavily and OpenRouter. Deep Research AI Agentic System that crawls websites using Tavily for online information gathering.")
 
 # Sidebar: Status and Info
 st.sidebar.header("OpenRouter Status")
-if check_openrouter_status():
+openrouter_status = openrouter_health.status()
+if openrouter_status == "operational":
     st.sidebar.success("Operational", icon="✅")
+elif openrouter_status == "unknown":
+    st.sidebar.info("Checking...", icon="⏳")
 else:
     st.sidebar.error("Down", icon="❌")
 
@@ -965,168 +657,124 @@ with st.expander(" Writing Style Preview"):
     }
     st.code(format_citation(example_citation, citation_format))
 
+# How often the page polls a running job for progress (seconds)
+JOB_POLL_INTERVAL = 1.0
+
+# What the UI says when a run reused a stage of the previous run
+REUSE_MESSAGES = {
+    "research": "Reused the research from your previous run (no new web search).",
+    "sections": "Kept the drafted sections from your previous run and re-rendered only the References (no LLM calls).",
+}
+
+def render_results(research_data, response, report, reused=()):
+    """Render a finished research run: sources, the structured summary and the raw research data."""
+    st.success("Research completed! 🎉", icon="✅")
+    for stage in reused:
+        st.caption(f"♻️ {REUSE_MESSAGES[stage]}")
+    st.subheader("Structured Summary 📝")
+
+    # First, display Research Summary section
+    st.write("### Research Summary 📊")
+    with st.expander("View Research Summary", expanded=True):
+        for item in research_data:
+            st.markdown(f"**{item['title']}**")
+            st.write(item['content'])
+            st.markdown(f"[Source]({item['url']})")
+            st.markdown("---")
+
+    st.write("### Detailed Analysis 📝")
+
+    # Then display the parsed report sections
+    for section in report:
+        if not section.paragraphs:
+            continue
+        with st.expander(section.heading, expanded=True):
+            if section.heading == "Analysis":
+                for paragraph in section.sentence_groups(6):
+                    st.write(paragraph)
+                    st.write("")
+            else:
+                for content in section.paragraphs:
+                    st.markdown(content)
+
+    if report.references:
+        with st.expander("References", expanded=True):
+            for i, ref in enumerate(report.references, 1):
+                # Format reference with number and add horizontal line
+                st.markdown(f"{i}. {ref}")
+                st.markdown("---")
+
+    # Calculate word count and page 
+    word_count = len(response.split())
+    page_estimate = word_count // 400 + 1  # Rough estimate: ~400 words per page
+    st.info(f"Summary contains {word_count} words, estimated at {page_estimate} pages.")
+
+    #  Display Interactive Research Data
+    st.write("### Research Data 📚")
+    for item in research_data:
+        with st.expander(item['title']):
+            st.write(item['content'])
+            st.markdown(f"[Visit Source]({item['url']})")
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def show_job_progress(job_id):
+    """Poll a running job and show its progress and live section drafts."""
+    job = background_jobs.get(job_id)
+    if job is None or job.finished:
+        # Rerun the whole page so the results (or the error) replace the progress view
+        st.rerun()
+    state = job.snapshot()
+    st.progress(state["progress"])
+    st.text(state["step"])
+    if state["status"] == "running":
+        for section_name in state["section_names"]:
+            text = state["section_buffers"][section_name]
+            if text:
+                st.markdown(f"**{section_name}**\n\n{clean_think_tags(text)}")
+
+# Reattach to this session's job, or after a refresh to the job recorded in the URL
+if st.session_state.active_job_id is None and "job" in st.query_params:
+    st.session_state.active_job_id = st.query_params["job"]
+active_job = background_jobs.get(st.session_state.active_job_id) if st.session_state.active_job_id else None
+if st.session_state.active_job_id and active_job is None:
+    st.info("The previous research run is no longer available. Please run it again.")
+    st.session_state.active_job_id = None
+    st.query_params.pop("job", None)
+
 # Research button logic
-if st.button("Run Research"):
+if st.button("Run Research", disabled=active_job is not None and not active_job.finished):
     if not query.strip():
         st.error("Please enter your research query.")
     elif not check_openrouter_status():
         st.error("OpenRouter is currently down. Please try again later.")
     else:
         try:
-            with st.spinner("Processing your request..."):
-                # Initialize progress bar and status
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-
-                # Step 1: Fetch research data
-                status_text.text("Step 1/3: Fetching research data... 🔍")
-                logging.info(f"Starting research for query: {query}, deep_research: {deep_research}, target_word_count: {target_word_count}")
-                research_data, response = run_research(
-                    query,
-                    deep_research=deep_research,
-                    target_word_count=target_word_count,
-                    writing_style=writing_style,
-                    citation_format=citation_format,
-                    language=language
-                )
-                progress_bar.progress(33)
-
-                # Step 2: Drafting response
-                status_text.text("Step 2/3: Drafting response... ")
-                if "Error drafting response" in response:
-                    st.error(response)
-                    logging.error(f"Failed to draft response: {response}")
-                else:
-                    progress_bar.progress(66)
-
-                    # Step 3: Generating PDF
-                    status_text.text("Step 3/3: Generating PDF report... ")
-                    st.success("Research completed! 🎉", icon="✅")
-                    st.subheader("Structured Summary 📝")
-
-                    # Display summary with collapsible sections
-                    sections = response.split("\n\n")
-                    current_section = None
-                    section_content = []
-
-                    # First, display Research Summary section
-                    st.write("### Research Summary 📊")
-                    with st.expander("View Research Summary", expanded=True):
-                        for item in research_data:
-                            st.markdown(f"**{item['title']}**")
-                            st.write(item['content'])
-                            st.markdown(f"[Source]({item['url']})")
-                            st.markdown("---")
-
-                    st.write("### Detailed Analysis 📝")
-                    
-                    # Then process other sections
-                    for section in sections:
-                        if section.startswith("**") and section.endswith("**"):
-                            # If we have accumulated content for the previous section, display it
-                            if current_section and section_content:
-                                with st.expander(current_section, expanded=True):
-                                    if current_section == "References":
-                                        # Special handling for references with numbering
-                                        references = "\n".join(section_content).strip().split("\n")
-                                        for i, ref in enumerate(references, 1):
-                                            if ref.strip():
-                                                # Format reference with number and add horizontal line
-                                                st.markdown(f"{i}. {ref.strip()}")
-                                                st.markdown("---")
-                                    elif current_section == "Analysis":
-                                        # Keep existing Analysis formatting
-                                        analysis_text = "\n".join(section_content)
-                                        sentences = re.split(r'(?<=[.!?])\s+', analysis_text)
-                                        paragraphs = []
-                                        current_paragraph = []
-                                        sentence_count = 0
-                                        
-                                        for sentence in sentences:
-                                            current_paragraph.append(sentence)
-                                            sentence_count += 1
-                                            if sentence_count >= 6:
-                                                paragraphs.append(" ".join(current_paragraph))
-                                                current_paragraph = []
-                                                sentence_count = 0
-                                        
-                                        if current_paragraph:
-                                            paragraphs.append(" ".join(current_paragraph))
-                                        
-                                        for paragraph in paragraphs:
-                                            st.write(paragraph)
-                                            st.write("")
-                                    else:
-                                        for content in section_content:
-                                            st.markdown(content)
-                                            
-                            # Start a new section
-                            current_section = section.strip("**").rstrip(":")
-                            section_content = []
-                        else:
-                            if current_section:
-                                section_content.append(section)
-
-                    # Display the last section
-                    if current_section and section_content:
-                        with st.expander(current_section, expanded=True):
-                            if current_section == "References":
-                                references = "\n".join(section_content).strip().split("\n")
-                                for i, ref in enumerate(references, 1):
-                                    if ref.strip():
-                                        # Format reference with number and add horizontal line
-                                        st.markdown(f"{i}. {ref.strip()}")
-                                        st.markdown("---")
-                            elif current_section == "Analysis":
-                                # Keep existing Analysis formatting
-                                analysis_text = "\n".join(section_content)
-                                sentences = re.split(r'(?<=[.!?])\s+', analysis_text)
-                                paragraphs = []
-                                current_paragraph = []
-                                sentence_count = 0
-                                
-                                for sentence in sentences:
-                                    current_paragraph.append(sentence)
-                                    sentence_count += 1
-                                    if sentence_count >= 6:
-                                        paragraphs.append(" ".join(current_paragraph))
-                                        current_paragraph = []
-                                        sentence_count = 0
-                                
-                                if current_paragraph:
-                                    paragraphs.append(" ".join(current_paragraph))
-                                
-                                for paragraph in paragraphs:
-                                    st.write(paragraph)
-                                    st.write("")
-                            else:
-                                for content in section_content:
-                                    st.markdown(content)
-
-                    # Calculate word count and page 
-                    word_count = len(response.split())
-                    page_estimate = word_count // 400 + 1  # Rough estimate: ~400 words per page
-                    st.info(f"Summary contains {word_count} words, estimated at {page_estimate} pages.")
-
-                    # Store results in session state
-                    st.session_state.research_data = research_data
-                    st.session_state.response = response
-                    st.session_state.pdf_buffer = generate_pdf(query, research_data, response, deep_research=deep_research)
-                    st.session_state.word_buffer = generate_docx(query, research_data, response, deep_research=deep_research)
-
-                    #  Display Interactive Research Data
-                    st.write("### Research Data 📚")
-                    for item in research_data:
-                        with st.expander(item['title']):
-                            st.write(item['content'])
-                            st.markdown(f"[Visit Source]({item['url']})")
-
-        except Exception as e:
-            st.error(f"Failed after retries: {str(e)}")
-            logging.error(f"Failed to process query '{query}': {str(e)}")
-        finally:
-            progress_bar.empty()  # Clear progress bar
-            status_text.empty()  # Clear status text
+            # Stages whose inputs did not change since this session's last run are reused, not redone
+            active_job = background_jobs.submit(
+                query, deep_research, target_word_count, writing_style, citation_format, language,
+                previous=active_job
+            )
+            st.session_state.active_job_id = active_job.id
+            st.query_params["job"] = active_job.id
+        except OverflowError as e:
+            st.warning(f"The server is busy ({str(e)}). Please try again in a few minutes.")
+            logging.warning(f"Rejected research for query '{query}': {str(e)}")
+
+if active_job is not None:
+    job_state = active_job.snapshot()
+    if not active_job.finished:
+        show_job_progress(active_job.id)
+    elif job_state["status"] == "failed":
+        st.error(job_state["response"])
+    else:
+        # Store results in session state
+        st.session_state.research_data = job_state["research_data"]
+        st.session_state.response = job_state["response"]
+        st.session_state.report = job_state["report"]
+        # Exports are rendered on demand when a format is selected below
+        st.session_state.report_query = job_state["params"]["query"]
+        st.session_state.report_deep_research = job_state["params"]["deep_research"]
+        render_results(job_state["research_data"], job_state["response"], job_state["report"], job_state["reused"])
 
 # Display download options if research data is available
 if st.session_state.research_data and st.session_state.response:
@@ -1144,7 +792,15 @@ if st.session_state.research_data and st.session_state.response:
         st.caption("Download as a PDF file.")
         st.download_button(
             label="Download PDF 📥",
-            data=st.session_state.pdf_buffer,
+            # Rendered only when the button is clicked, and cached across sessions
+            data=partial(
+                export_report,
+                "pdf",
+                st.session_state.report_query,
+                st.session_state.research_data,
+                st.session_state.report or st.session_state.response,
+                deep_research=st.session_state.report_deep_research
+            ),
             file_name="research_report.pdf",
             mime="application/pdf"
         )
@@ -1152,7 +808,15 @@ if st.session_state.research_data and st.session_state.response:
         st.caption("Download as a Word document.")
         st.download_button(
             label="Download Word 📥",
-            data=st.session_state.word_buffer,
+            # Rendered only when the button is clicked, and cached across sessions
+            data=partial(
+                export_report,
+                "docx",
+                st.session_state.report_query,
+                st.session_state.research_data,
+                st.session_state.report or st.session_state.response,
+                deep_research=st.session_state.report_deep_research
+            ),
             file_name="research_report.docx",
             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
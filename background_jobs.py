@@ -0,0 +1,198 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from main import fetch_research_data
+from draft_agent import draft_answer_stream, get_section_names, prewarm_llm, rerender_references, reusable_stages
+from report_model import parse_report
+from run_checkpoints import run_checkpoints
+from tracing import span, trace_run
+
+# Research runs executing at once per server process, and how long finished jobs stay available for reattaching
+BACKGROUND_MAX_RUNS = int(os.getenv("BACKGROUND_MAX_RUNS", "2"))
+BACKGROUND_JOB_TTL = float(os.getenv("BACKGROUND_JOB_TTL", str(60 * 60)))
+
+class ResearchJob:
+    """State of one research run, written by its worker thread and read by page reruns."""
+
+    def __init__(self, query: str, deep_research: bool, target_word_count: int,
+                 writing_style: str, citation_format: str, language: str, previous: "ResearchJob" = None):
+        self.id = uuid.uuid4().hex
+        self.params = {
+            "query": query,
+            "deep_research": deep_research,
+            "target_word_count": target_word_count,
+            "writing_style": writing_style,
+            "citation_format": citation_format,
+            "language": language,
+        }
+        self.section_names = get_section_names(deep_research)
+        # Stages whose output is taken from the previous successful run instead of being redone
+        self.previous = previous if previous is not None and previous.status == "done" else None
+        self.reused = reusable_stages(self.previous.params, self.params) if self.previous else []
+        self._lock = threading.Lock()
+        self.status = "queued"  # queued -> running -> done | failed
+        self.step = "Waiting for a free research slot... ⏳"
+        self.progress = 0
+        self.section_buffers = {name: "" for name in self.section_names}
+        self.research_data = []
+        self.response = None
+        self.report = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def snapshot(self) -> dict:
+        """Consistent copy of the job state for rendering."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "params": dict(self.params),
+                "status": self.status,
+                "step": self.step,
+                "progress": self.progress,
+                "section_names": list(self.section_names),
+                "section_buffers": dict(self.section_buffers),
+                "research_data": self.research_data,
+                "response": self.response,
+                "report": self.report,
+                "reused": list(self.reused),
+            }
+
+    def run(self):
+        """Fetch research data and stream the draft, recording progress as it goes.
+
+        Traced and checkpointed under the job id, so an interrupted run can be continued with main.resume(job id).
+        """
+        with trace_run(self.id, query=self.params["query"], deep_research=self.params["deep_research"]):
+            self._run()
+
+    def _run(self):
+        params = self.params
+        self.update(status="running", step="Step 1/3: Fetching research data... 🔍")
+        logging.info(f"Starting research for query: {params['query']}, deep_research: {params['deep_research']}, target_word_count: {params['target_word_count']}")
+        response = "Error drafting response: No research data provided"
+        report = None
+        try:
+            run_checkpoints.start(self.id, params)
+            if "sections" not in self.reused:
+                # Build the LLM client and open its connections while the research runs
+                prewarm_llm()
+            if "research" in self.reused:
+                research_data = self.previous.research_data
+            else:
+                try:
+                    with span("research", deep_research=params["deep_research"]):
+                        research_data = fetch_research_data(params["query"], params["deep_research"])
+                except Exception as e:
+                    research_data = []
+                    response = f"Error drafting response: Workflow failed: {str(e)}"
+            if research_data:
+                run_checkpoints.save_research(self.id, research_data)
+            self.update(research_data=research_data, progress=33, step="Step 2/3: Drafting response... ")
+
+            if "sections" in self.reused:
+                # Only the citation format (or nothing) changed: keep the drafted prose
+                with span("references", citation_format=params["citation_format"]):
+                    response = rerender_references(self.previous.response, research_data, params["citation_format"])
+                    report = parse_report(response)
+            elif research_data:
+                finished_sections = 0
+                with span("draft", deep_research=params["deep_research"], target_word_count=params["target_word_count"]):
+                    for section_name, event, text in draft_answer_stream(research_data, **params):
+                        if event == "report":
+                            report = text
+                            continue
+                        if event == "done":
+                            response = text
+                            break
+                        if event == "section":
+                            run_checkpoints.save_section(self.id, section_name, text)
+                        with self._lock:
+                            if event == "token":
+                                self.section_buffers[section_name] += text
+                            elif event == "retry":
+                                self.section_buffers[section_name] = ""
+                            else:  # "section" or "error": final text for this section
+                                self.section_buffers[section_name] = text
+                                finished_sections += 1
+                                self.progress = 33 + 33 * finished_sections // len(self.section_names)
+        except Exception as e:
+            response = f"Error drafting response: {str(e)}"
+
+        failed = "Error drafting response" in response
+        if failed:
+            logging.error(f"Failed to draft response: {response}")
+        try:
+            run_checkpoints.finish(self.id, error=response if failed else None, draft=None if failed else response)
+        finally:
+            # Always reach a terminal status, so the job frees its admission slot and the UI stops polling
+            self.update(
+                status="failed" if failed else "done",
+                step="Step 3/3: Done",
+                progress=100,
+                response=response,
+                report=report,
+                finished_at=time.monotonic(),
+                previous=None  # drop the reference so finished jobs do not chain
+            )
+
+class BackgroundJobs:
+    """Process-wide executor for research runs shared by every Streamlit session.
+
+    At most `max_runs` jobs are admitted at once (running or waiting); further
+    submissions raise OverflowError until one finishes. Finished jobs are kept
+    for `ttl` seconds so a refreshed page can reattach and read the results.
+    """
+
+    def __init__(self, max_runs: int = BACKGROUND_MAX_RUNS, ttl: float = BACKGROUND_JOB_TTL):
+        self.max_runs = max_runs
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_runs, thread_name_prefix="research-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def _prune(self):
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(self, query: str, deep_research: bool = False, target_word_count: int = 1000,
+               writing_style: str = "academic", citation_format: str = "APA", language: str = "english",
+               previous: ResearchJob = None) -> ResearchJob:
+        """Admit and start a research run, or raise OverflowError if the process is at capacity.
+
+        With the session's previous job, stages whose inputs did not change reuse its output.
+        """
+        with self._lock:
+            self._prune()
+            if sum(1 for job in self._jobs.values() if not job.finished) >= self.max_runs:
+                raise OverflowError(f"{self.max_runs} research runs are already in progress")
+            job = ResearchJob(query, deep_research, target_word_count, writing_style, citation_format, language, previous)
+            self._jobs[job.id] = job
+        self._executor.submit(job.run)
+        return job
+
+    def get(self, job_id: str) -> ResearchJob:
+        """Return the job with this id, or None if it is unknown or has expired."""
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+# Module-level so every session of the server process shares one executor
+background_jobs = BackgroundJobs()
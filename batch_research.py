@@ -0,0 +1,194 @@
+"""Run research for a JSONL list of query specs, e.g. a nightly topic list.
+
+Each input line is a JSON object:
+    {"id": "sugar-1", "query": "why sugar is bad for your health", "mode": "deep",
+     "style": "academic", "language": "english", "citation_format": "APA", "word_count": 1500}
+Only "query" is required. Results are appended to the output JSONL as they finish,
+and completed IDs are checkpointed so a crashed batch resumes where it stopped.
+
+    python batch_research.py topics.jsonl -o results.jsonl --workers 4 --shard 0/2
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from main import run_research
+
+def spec_id(spec: dict) -> str:
+    """Return the spec's id, or a stable id derived from its contents."""
+    if spec.get("id") is not None:
+        return str(spec["id"])
+    payload = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+def spec_field(spec: dict, names: tuple, default, kind: type):
+    """Return the first of names present in spec (else default), checked against kind; raise ValueError if it does not fit."""
+    name = next((name for name in names if name in spec), None)
+    if name is None:
+        return default
+    value = spec[name]
+    if kind is int:
+        # Accept 1500, 1500.0 and "1500", but not null, booleans or free text
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer, got {json.dumps(value)}")
+        if value < 1:
+            raise ValueError(f"{name} must be positive, got {value}")
+        return value
+    if not isinstance(value, kind):
+        raise ValueError(f"{name} must be a {'boolean' if kind is bool else 'string'}, got {json.dumps(value)}")
+    return value
+
+def normalize_spec(spec: dict) -> dict:
+    """Map a JSONL query spec to run_research keyword arguments; raise ValueError for a malformed spec."""
+    query = spec.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("spec has no query")
+    if spec.get("deep_research") is not None:
+        deep_research = spec_field(spec, ("deep_research",), False, bool)
+    else:
+        deep_research = spec_field(spec, ("mode",), "quick", str).lower() == "deep"
+    return {
+        "query": query,
+        "deep_research": deep_research,
+        "target_word_count": spec_field(spec, ("word_count", "target_word_count"), 1000, int),
+        "writing_style": spec_field(spec, ("style", "writing_style"), "academic", str),
+        "citation_format": spec_field(spec, ("citation_format",), "APA", str),
+        "language": spec_field(spec, ("language",), "english", str),
+    }
+
+def parse_shard(value: str) -> tuple:
+    """Parse "i/n" into (i, n)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must look like i/n, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard index must satisfy 0 <= i < n")
+    return index, count
+
+def in_shard(job_id: str, shard: tuple) -> bool:
+    """Stable shard assignment by id, independent of the order of the input file."""
+    index, count = shard
+    return zlib.crc32(job_id.encode("utf-8")) % count == index
+
+def load_specs(path: str) -> list:
+    """Read query specs from a JSONL file, skipping blank lines."""
+    specs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                specs.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})")
+    return specs
+
+def load_checkpoint(path: str) -> set:
+    """Return the ids already completed in a previous run."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+class BatchWriter:
+    """Appends result records and checkpoint ids from several worker threads."""
+
+    def __init__(self, output_path: str, checkpoint_path: str):
+        self._lock = threading.Lock()
+        self._output = open(output_path, "a", encoding="utf-8")
+        self._checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    def write(self, record: dict, completed: bool):
+        with self._lock:
+            self._output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._output.flush()
+            os.fsync(self._output.fileno())
+            # Checkpoint only after the result is durable, so a crash never loses a completed job
+            if completed:
+                self._checkpoint.write(record["id"] + "\n")
+                self._checkpoint.flush()
+                os.fsync(self._checkpoint.fileno())
+
+    def close(self):
+        self._output.close()
+        self._checkpoint.close()
+
+def run_job(job_id: str, spec: dict) -> dict:
+    """Run one spec and build its result record."""
+    record = {"id": job_id, "spec": spec}
+    started = time.time()
+    try:
+        kwargs = normalize_spec(spec)
+        research_data, response = run_research(**kwargs, run_id=job_id)
+        failed = not research_data or response.startswith(("Workflow failed", "Error"))
+        record.update({
+            "status": "error" if failed else "ok",
+            "research": research_data,
+            "response": response,
+        })
+    except Exception as e:
+        record.update({"status": "error", "research": [], "response": f"{type(e).__name__} - {str(e)}"})
+    record["elapsed"] = round(time.time() - started, 3)
+    return record
+
+def run_batch(input_path: str, output_path: str, workers: int = 2, checkpoint_path: str = None, shard: tuple = (0, 1)) -> dict:
+    """Run every pending spec of this shard and return a summary of the batch."""
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    completed = load_checkpoint(checkpoint_path)
+
+    jobs = []
+    seen = set()
+    for spec in load_specs(input_path):
+        job_id = spec_id(spec)
+        if job_id in seen or not in_shard(job_id, shard):
+            continue
+        seen.add(job_id)
+        if job_id not in completed:
+            jobs.append((job_id, spec))
+
+    summary = {"shard": f"{shard[0]}/{shard[1]}", "skipped": len(seen) - len(jobs), "ok": 0, "error": 0}
+    print(f"Running {len(jobs)} jobs ({summary['skipped']} already completed) with {workers} workers", file=sys.stderr)
+
+    writer = BatchWriter(output_path, checkpoint_path)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(run_job, job_id, spec): job_id for job_id, spec in jobs}
+            for future in as_completed(futures):
+                record = future.result()
+                ok = record["status"] == "ok"
+                writer.write(record, completed=ok)
+                summary["ok" if ok else "error"] += 1
+                print(f"[{summary['ok'] + summary['error']}/{len(jobs)}] {record['id']}: {record['status']} ({record['elapsed']}s)", file=sys.stderr)
+                if not ok:
+                    logging.error(f"Batch job {record['id']} failed: {record['response']}")
+    finally:
+        writer.close()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run research for every query spec in a JSONL file.")
+    parser.add_argument("input", help="JSONL file with one query spec per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="number of research runs in flight (default: 2)")
+    parser.add_argument("--checkpoint", help="file of completed ids (default: <output>.checkpoint)")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="run only shard i of n, e.g. 0/4")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.input, args.output, args.workers, args.checkpoint, args.shard)
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary["error"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Render-time and memory benchmark for the PDF and DOCX exports of large reports.
+
+Builds synthetic reports in the draft output format (from a quick 1000-word
+report up to 5000-word deep reports with 30-200 sources) and renders each case
+and format in a fresh child process, recording render time, peak RSS and the
+size of the output. Rendering calls generate_pdf/generate_docx directly, so the
+export cache never hides the cost.
+
+    python benchmark_exports.py -o bench_exports.json
+    python benchmark_exports.py --baseline bench_exports.json --tolerance 0.25 --max-rss-mb 500
+
+With --baseline, --max-seconds or --max-rss-mb the run exits with status 1 when
+any case regresses beyond the tolerance or exceeds the limits.
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import resource
+import argparse
+import platform
+import subprocess
+
+from benchmark_stand_ins import synthetic_text, synthetic_sources
+
+QUICK_SECTIONS = ["Key Findings", "Analysis"]
+DEEP_SECTIONS = ["Abstract", "Introduction", "Literature Review", "Key Findings", "Analysis", "Conclusion"]
+
+# name -> (deep_research, report words, sources)
+CASES = {
+    "quick-1000w-5src": (False, 1000, 5),
+    "deep-5000w-30src": (True, 5000, 30),
+    "deep-5000w-100src": (True, 5000, 100),
+    "deep-5000w-200src": (True, 5000, 200),
+}
+FORMATS = ("pdf", "docx")
+# Metrics compared against a baseline; output size is reported but not gated
+GATED_METRICS = ("render_s", "peak_rss_mb")
+
+def synthetic_report(query: str, deep_research: bool, words: int, sources: list) -> str:
+    """A drafted response in the same shape draft_answer produces, including the References block."""
+    sections = DEEP_SECTIONS if deep_research else QUICK_SECTIONS
+    per_section = words // len(sections)
+    response_text = ""
+    for section_name in sections:
+        text = synthetic_text(f"{query}-{section_name}", per_section)
+        if section_name == "Key Findings":
+            sentences = text.split(". ")
+            text = "\n".join(f"{i}. {sentence.rstrip('.')}." for i, sentence in enumerate(sentences, 1))
+        response_text += f"\n\n**{section_name}**\n\n{text}"
+    response_text += "\n\n**References**\n\n"
+    response_text += "\n".join(
+        f"{source['title']}. (2026, October 17). Retrieved from {source['url']}" for source in sources
+    )
+    return response_text
+
+def render_case(case: str, export_format: str) -> dict:
+    """Render one case in this process and measure it (run in a fresh child, so peak RSS is per case)."""
+    from report_exports import generate_pdf, generate_docx
+
+    deep_research, words, count = CASES[case]
+    query = f"export benchmark {case}"
+    data = synthetic_sources(query, count)
+    summary = synthetic_report(query, deep_research, words, data)
+    renderer = generate_pdf if export_format == "pdf" else generate_docx
+
+    started = time.perf_counter()
+    # Fixed cover details, so the renderer never probes OpenRouter during the timed section
+    content = renderer(
+        query, data, summary, deep_research, report_date=datetime.date(2026, 10, 17), openrouter_status=True
+    ).getvalue()
+    render_s = time.perf_counter() - started
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    return {
+        "name": f"{case}/{export_format}",
+        "case": case,
+        "format": export_format,
+        "deep_research": deep_research,
+        "words": words,
+        "sources": count,
+        "render_s": round(render_s, 4),
+        "peak_rss_mb": round(peak_rss_mb, 2),
+        "output_bytes": len(content),
+    }
+
+def run_child(case: str, export_format: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", case, export_format],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def check_thresholds(results: list, baseline: dict = None, tolerance: float = 0.25,
+                     max_seconds: float = None, max_rss_mb: float = None) -> list:
+    """Return a description of every result that regressed against the baseline or broke a limit."""
+    violations = []
+    previous = {result["name"]: result for result in (baseline or {}).get("results", [])}
+    for result in results:
+        if max_seconds is not None and result["render_s"] > max_seconds:
+            violations.append(f"{result['name']}: render_s {result['render_s']} > {max_seconds}")
+        if max_rss_mb is not None and result["peak_rss_mb"] > max_rss_mb:
+            violations.append(f"{result['name']}: peak_rss_mb {result['peak_rss_mb']} > {max_rss_mb}")
+        if result["name"] in previous:
+            for metric in GATED_METRICS:
+                limit = previous[result["name"]][metric] * (1 + tolerance)
+                if result[metric] > limit:
+                    violations.append(
+                        f"{result['name']}: {metric} {result[metric]} > {round(limit, 4)} "
+                        f"(baseline {previous[result['name']][metric]} + {tolerance:.0%})"
+                    )
+    return violations
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF/DOCX export of synthetic reports.")
+    parser.add_argument("-o", "--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--repeats", type=int, default=1, help="renders per case and format; the fastest is kept (default: 1)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression over the baseline (default: 0.25)")
+    parser.add_argument("--max-seconds", type=float, help="fail when any render takes longer")
+    parser.add_argument("--max-rss-mb", type=float, help="fail when any render's peak RSS is higher")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "FORMAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(render_case(*args.child)))
+        return 0
+
+    results = []
+    for case in args.cases:
+        for export_format in args.formats:
+            runs = [run_child(case, export_format) for _ in range(max(1, args.repeats))]
+            result = min(runs, key=lambda run: run["render_s"])
+            results.append(result)
+            print(f"{result['name']}: {result['render_s']:.2f}s, {result['peak_rss_mb']:.0f} MB RSS, "
+                  f"{result['output_bytes']} bytes", file=sys.stderr)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    violations = check_thresholds(results, baseline, args.tolerance, args.max_seconds, args.max_rss_mb)
+
+    report = {
+        "benchmark": "exports",
+        "format_version": 1,
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "child")},
+        "results": results,
+        "violations": violations,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for violation in violations:
+        print(f"REGRESSION {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
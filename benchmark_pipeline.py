@@ -0,0 +1,166 @@
+"""End-to-end pipeline benchmark against local Tavily/OpenRouter stand-ins (no API quota used).
+
+Drives run_research, research_web and draft_answer in quick and deep mode,
+each once with empty caches ("cold") and then with warm caches ("warm"), and
+records wall time, CPU time, peak traced Python memory and the upstream calls
+the stand-ins received. Results are written as JSON with sorted keys, so runs
+can be diffed to spot regressions in concurrency, caching or prompt size.
+
+    python benchmark_pipeline.py -o bench_pipeline.json --latency 0.2 --token-rate 200 --error-rate 0.05
+
+The OpenRouter token bucket is disabled (OPENROUTER_RATE_LIMIT=0) unless set in
+the environment, so free-tier pacing does not dominate the numbers.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+from benchmark_stand_ins import StandInProcess, synthetic_sources
+
+TARGETS = ("run_research", "research_web", "draft_answer")
+MODES = ("quick", "deep")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def configure_environment(base_url: str, workdir: str):
+    """Point the pipeline at the stand-ins and at throwaway caches; must run before the pipeline is imported."""
+    os.environ["TAVILY_API_BASE_URL"] = base_url
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/v1"
+    os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+    os.environ["RESEARCH_CACHE_DIR"] = os.path.join(workdir, "research")
+    os.environ["SECTION_CACHE_DIR"] = os.path.join(workdir, "sections")
+    os.environ["TRACE_FILE"] = os.path.join(workdir, "traces.jsonl")
+    os.environ["RUN_CHECKPOINT_DB"] = os.path.join(workdir, "runs.sqlite3")
+    os.environ.setdefault("OPENROUTER_RATE_LIMIT", "0")
+    os.environ.setdefault("DRAFT_RETRY_MAX_WAIT", "1")
+
+def measure(function, trace_memory: bool = True) -> tuple:
+    """Run function once and return its result with wall time, CPU time and peak traced memory."""
+    if trace_memory:
+        tracemalloc.start()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    result = function()
+    metrics = {
+        "wall_s": time.perf_counter() - wall_started,
+        "cpu_s": time.process_time() - cpu_started,
+    }
+    if trace_memory:
+        metrics["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result, metrics
+
+def succeeded(target: str, result) -> bool:
+    if target == "run_research":
+        research_data, response = result
+        return bool(research_data) and not response.startswith(("Workflow failed", "Error"))
+    if target == "research_web":
+        return bool(result)
+    return not result.startswith("Error drafting response")
+
+def summarize_phase(runs: list) -> dict:
+    """Median of each metric over the repeats of a phase, with the mean upstream calls per run."""
+    summary = {
+        metric: round(statistics.median(run[metric] for run in runs), 4)
+        for metric in runs[0] if metric not in ("ok", "upstream")
+    }
+    summary["ok"] = all(run["ok"] for run in runs)
+    summary["repeats"] = len(runs)
+    summary["upstream"] = {
+        counter: round(statistics.mean(run["upstream"][counter] for run in runs), 2)
+        for counter in runs[0]["upstream"]
+    }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against local stand-ins.")
+    parser.add_argument("-o", "--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeats", type=int, default=3, help="warm runs per configuration (default: 3)")
+    parser.add_argument("--query", default="benchmark topic for the research pipeline")
+    parser.add_argument("--word-count", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in latency in seconds (default: 0.2)")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="stand-in tokens per second (default: 200)")
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows the measured code)")
+    args = parser.parse_args(argv)
+
+    settings = {key: value for key, value in vars(args).items() if key != "output"}
+    stand_in_options = {
+        "latency": args.latency,
+        "token_rate": args.token_rate,
+        "completion_tokens": args.completion_tokens,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+    }
+    stand_ins = StandInProcess(free_port(), **stand_in_options)
+    workdir = tempfile.mkdtemp(prefix="research-bench-")
+    configure_environment(stand_ins.base_url, workdir)
+
+    # Imported only now so the modules pick up the stand-in endpoints and cache directories
+    from main import run_research, research_cache
+    from research_agent import research_web
+    from draft_agent import draft_answer, section_cache
+
+    def call(target, deep_research):
+        if target == "run_research":
+            return lambda: run_research(args.query, deep_research, args.word_count)
+        if target == "research_web":
+            return lambda: research_web(args.query, deep_research)
+        data = synthetic_sources(args.query, 30 if deep_research else 5)
+        return lambda: draft_answer(data, deep_research, args.word_count, query=args.query)
+
+    results = []
+    try:
+        for target in args.targets:
+            for mode in args.modes:
+                research_cache.clear()
+                section_cache.clear()
+                phases = {"cold": [], "warm": []}
+                for phase in ["cold"] + ["warm"] * args.repeats:
+                    stand_ins.reset()
+                    result, metrics = measure(call(target, mode == "deep"), not args.no_memory)
+                    metrics["ok"] = succeeded(target, result)
+                    metrics["upstream"] = stand_ins.stats()
+                    phases[phase].append(metrics)
+                for phase, runs in phases.items():
+                    if runs:
+                        results.append({"name": f"{target}/{mode}/{phase}", "target": target, "mode": mode,
+                                        "phase": phase, **summarize_phase(runs)})
+                print(f"{target}/{mode}: cold {phases['cold'][0]['wall_s']:.2f}s", file=sys.stderr)
+    finally:
+        stand_ins.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "pipeline",
+        "format_version": 1,
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "settings": settings,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if all(result["ok"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Local stand-ins for the Tavily search API and the OpenRouter (OpenAI-compatible) chat API.
+
+One aiohttp server answers both, with configurable latency, token rate and
+error injection, so the pipeline can be benchmarked without spending quota:
+
+    POST /search                  Tavily search (deterministic synthetic sources)
+    POST /v1/chat/completions     chat completions, streamed (SSE) or not
+    GET  /v1/models               model list (health probe)
+    GET  /_stats, POST /_reset    call counters used by the benchmarks
+
+    python benchmark_stand_ins.py --port 8799 --latency 0.2 --token-rate 200 --error-rate 0.05
+
+Point TAVILY_API_BASE_URL at http://127.0.0.1:<port> and OPENROUTER_BASE_URL at
+http://127.0.0.1:<port>/v1. benchmark_pipeline.py starts and stops it itself.
+"""
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+from aiohttp import web
+
+_SYLLABLES = ["ka", "lo", "mi", "ren", "tos", "vu", "zel", "qua", "dri", "po", "sen", "tha", "mor", "lyn", "gar", "ix"]
+def _vocabulary(size: int = 2000) -> list:
+    """Fixed vocabulary of distinct pseudo-words, so synthetic text is reproducible across runs and machines."""
+    rng = random.Random(0)
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+VOCABULARY = _vocabulary()
+
+def synthetic_text(seed: str, words: int) -> str:
+    """Deterministic pseudo-prose of `words` words; different seeds give dissimilar text."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(words):
+        word = rng.choice(VOCABULARY)
+        out.append(word.capitalize() if i % 12 == 0 else word)
+        if i % 12 == 11:
+            out[-1] += "."
+    return " ".join(out).rstrip(".") + "."
+
+def synthetic_sources(query: str, count: int, words: int = 300) -> list:
+    """Deterministic search results with unique URLs and dissimilar content."""
+    return [
+        {
+            "title": f"{synthetic_text(f'{query}-title-{i}', 6).rstrip('.')}",
+            "url": f"https://source{i}.example.com/{zlib.crc32(query.encode('utf-8')) % 10000}/article-{i}",
+            "content": synthetic_text(f"{query}-{i}", words),
+        }
+        for i in range(count)
+    ]
+
+def estimate_prompt_tokens(messages) -> int:
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(message.get("content", ""))) // 4 for message in messages)
+
+class StandIns:
+    """Request handlers and counters of the stand-in server."""
+
+    def __init__(self, latency: float = 0.2, token_rate: float = 200.0, completion_tokens: int = 300,
+                 error_rate: float = 0.0, error_status: int = 429, source_words: int = 300, seed: int = 0):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.source_words = source_words
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.rng = random.Random(self.seed)
+        self.stats = {
+            "search_calls": 0,
+            "chat_calls": 0,
+            "injected_errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def inject_error(self):
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            self.stats["injected_errors"] += 1
+            return web.json_response(
+                {"error": {"message": "injected error", "code": self.error_status}},
+                status=self.error_status,
+                headers={"Retry-After": "0"}
+            )
+        return None
+
+    async def search(self, request):
+        self.stats["search_calls"] += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency)
+        error = self.inject_error()
+        if error is not None:
+            return error
+        query = body.get("query", "")
+        results = synthetic_sources(query, int(body.get("max_results", 5)), self.source_words)
+        return web.json_response({"query": query, "results": results, "response_time": self.latency})
+
+    def completion_words(self, messages) -> list:
+        words = synthetic_text(json.dumps(messages)[-200:], self.completion_tokens).split(" ")
+        # Numbered points so Key Findings post-processing has something to split
+        for number, index in enumerate(range(0, len(words), max(1, len(words) // 4)), 1):
+            words[index] = f"{number}. {words[index]}"
+        return words
+
+    async def chat(self, request):
+        self.stats["chat_calls"] += 1
+        body = await request.json()
+        messages = body.get("messages", [])
+        self.stats["prompt_tokens"] += estimate_prompt_tokens(messages)
+        await asyncio.sleep(self.latency)  # time to first token
+        error = self.inject_error()
+        if error is not None:
+            return error
+        words = self.completion_words(messages)
+        self.stats["completion_tokens"] += len(words)
+        delay = 1 / self.token_rate if self.token_rate > 0 else 0
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay * len(words))
+            return web.json_response({
+                "id": "chatcmpl-standin",
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model", "stand-in"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": estimate_prompt_tokens(messages), "completion_tokens": len(words), "total_tokens": 0},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for word in words:
+            chunk = {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", "stand-in"),
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            if delay:
+                await asyncio.sleep(delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def models(self, request):
+        return web.json_response({"data": [{"id": "stand-in"}]})
+
+    async def get_stats(self, request):
+        return web.json_response(self.stats)
+
+    async def post_reset(self, request):
+        self.reset()
+        return web.json_response(self.stats)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/search", self.search),
+            web.post("/v1/chat/completions", self.chat),
+            web.get("/v1/models", self.models),
+            web.get("/_stats", self.get_stats),
+            web.post("/_reset", self.post_reset),
+        ])
+        return app
+
+class StandInProcess:
+    """Runs the stand-in server in a child process so it does not skew CPU and memory measurements."""
+
+    def __init__(self, port: int, **options):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        args = [sys.executable, __file__, "--port", str(port)]
+        for name, value in options.items():
+            args += [f"--{name.replace('_', '-')}", str(value)]
+        self.process = subprocess.Popen(args)
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                self.stats()
+                break
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("stand-in server did not start")
+                time.sleep(0.1)
+
+    def _request(self, path: str, method: str = "GET") -> dict:
+        request = urllib.request.Request(self.base_url + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def stats(self) -> dict:
+        return self._request("/_stats")
+
+    def reset(self) -> dict:
+        return self._request("/_reset", "POST")
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve local Tavily and OpenAI-compatible stand-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before a search returns / the first token (default: 0.2)")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="completion tokens per second, 0 for instant (default: 200)")
+    parser.add_argument("--completion-tokens", type=int, default=300, help="words per completion (default: 300)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with --error-status (default: 0)")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status of injected errors (default: 429)")
+    parser.add_argument("--source-words", type=int, default=300, help="words of content per search result (default: 300)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stand_ins = StandIns(args.latency, args.token_rate, args.completion_tokens, args.error_rate,
+                         args.error_status, args.source_words, args.seed)
+    web.run_app(stand_ins.create_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
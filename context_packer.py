@@ -0,0 +1,100 @@
+import json
+import math
+import re
+from typing import List, Dict, Any
+
+# Rough characters-per-token ratio for English prose with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+# Collapse runs of whitespace left over from scraped page content
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text without loading a tokenizer."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, on a word boundary, marking the cut with an ellipsis."""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + " ..."
+
+def fair_share(lengths: List[int], budget: int) -> List[int]:
+    """Split a token budget across items so short items stay whole and long items are cut evenly."""
+    allocations = [0] * len(lengths)
+    remaining = budget
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if lengths[index] <= share:
+            allocations[index] = lengths[index]
+            remaining -= lengths[index]
+            pending.pop(0)
+        else:
+            # Every remaining item is longer than the even share; cut them all to it
+            for index in pending:
+                allocations[index] = share
+            break
+    return allocations
+
+def format_source_header(index: int, item: Dict[str, Any]) -> str:
+    """Plain-text header for one source in a section prompt: its number, title and URL."""
+    return f"[{index}] {item.get('title', '')} ({item.get('url', '')})"
+
+def unpacked_tokens(data: List[Dict[str, Any]], citations: List[str] = None) -> int:
+    """Tokens the sources used to cost: double JSON-encoded data plus the citation list."""
+    return estimate_tokens(json.dumps({
+        "content": json.dumps(data),
+        "citations": [citation for citation in (citations or []) if citation]
+    }))
+
+def pack_sources(
+    data: List[Dict[str, Any]],
+    token_budget: int = 6000,
+    indices: List[int] = None,
+    original_tokens: int = None
+) -> Dict[str, Any]:
+    """Render research sources as plain text that fits a token budget.
+
+    Sources are written without JSON escaping, whitespace is collapsed, and
+    content is truncated fairly across items when the budget is exceeded.
+    `indices` keeps the original 1-based source numbers when packing a subset,
+    and `original_tokens` overrides the unpacked baseline used for reporting.
+    Returns the packed text together with token estimates for reporting.
+    """
+    indices = indices or list(range(1, len(data) + 1))
+    headers = [format_source_header(index, item) for index, item in zip(indices, data)]
+    contents = [_WHITESPACE_RE.sub(" ", item.get("content", "") or "").strip() for item in data]
+
+    header_tokens = sum(estimate_tokens(header) + 1 for header in headers)
+    content_budget = max(0, token_budget - header_tokens)
+    content_tokens = [estimate_tokens(content) for content in contents]
+    allocations = fair_share(content_tokens, content_budget)
+
+    blocks = []
+    truncated = 0
+    for header, content, tokens, allocation in zip(headers, contents, content_tokens, allocations):
+        if allocation < tokens:
+            content = truncate_to_tokens(content, allocation)
+            truncated += 1
+        blocks.append(f"{header}\n{content}" if content else header)
+
+    text = "\n\n".join(blocks)
+    if original_tokens is None:
+        original_tokens = unpacked_tokens(data)
+    packed_tokens = estimate_tokens(text)
+    return {
+        "text": text,
+        "tokens": packed_tokens,
+        "original_tokens": original_tokens,
+        "saved_tokens": max(0, original_tokens - packed_tokens),
+        "truncated_items": truncated,
+    }
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Persistent key/value cache shared by every process pointing at the same directory
+class DiskCache:
+    """JSON-file cache with TTL expiry, LRU eviction and cross-process file locking.
+
+    Each entry is stored as one JSON file named after its key. Writes are atomic
+    (temp file + rename), so readers never see partial entries; writes and
+    evictions are serialized across processes with a lock file. The file
+    modification time records the last access and drives LRU eviction.
+
+    Eviction scans the whole directory, so it runs in batches rather than on every
+    write: when the estimated entry count exceeds max_entries (trimming to
+    `low_water` of it), and every `evict_every` writes to sweep expired entries
+    and resync the estimate with entries written by other processes.
+    """
+
+    def __init__(self, directory: str, ttl: float = None, max_entries: int = 1000,
+                 evict_every: int = 100, low_water: float = 0.9):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+        # Estimated entry count (None until the first eviction pass) and writes since that pass
+        self._entry_count = None
+        self._writes_since_evict = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, ".lock")
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Build a stable cache key from JSON-serializable parts."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the cache directory (shared across processes)."""
+        with open(self._lock_path, "a+") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get(self, key: str, default=None):
+        """Return the cached value for key, or default if it is missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return default
+
+        if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            with self._locked():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._count("misses")
+            return default
+
+        # Record the access for LRU eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count("hits")
+        return entry.get("value", default)
+
+    def set(self, key: str, value):
+        """Store a JSON-serializable value and evict least recently used entries over the size bound."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "value": value}, f)
+        with self._locked():
+            new_entry = not os.path.exists(path)
+            os.replace(tmp_path, path)
+            if self._eviction_due(new_entry):
+                self._evict()
+
+    def _eviction_due(self, new_entry: bool) -> bool:
+        """Record a write and decide whether it should trigger an eviction pass (lock held)."""
+        if self._entry_count is None:
+            return True
+        self._writes_since_evict += 1
+        self._entry_count += new_entry
+        over_limit = bool(self.max_entries) and self._entry_count > self.max_entries
+        return over_limit or self._writes_since_evict >= self.evict_every
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones down to the low-water mark (lock held)."""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+
+        entries.sort()
+        excess = 0
+        if self.max_entries and len(entries) > self.max_entries:
+            # Trim below the bound, so the next eviction pass is a batch of writes away
+            excess = len(entries) - int(self.max_entries * self.low_water)
+        remaining = len(entries)
+        for index, (mtime, path) in enumerate(entries):
+            expired = self.ttl is not None and now - mtime > self.ttl
+            if index < excess or expired:
+                try:
+                    os.remove(path)
+                    self._count("evictions")
+                    remaining -= 1
+                except OSError:
+                    pass
+        self._entry_count = remaining
+        self._writes_since_evict = 0
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._locked():
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+            self._entry_count = 0
+        logging.info(f"Cleared cache at {self.directory}")
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters for this process and the current entry count."""
+        size = sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
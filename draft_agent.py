@@ -1,12 +1,15 @@
 import os
-import json
-import time
+import random
+import asyncio
+import queue
+import contextvars
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.tools import StructuredTool
-import requests
-from openai import APIConnectionError
+import threading
+# langchain_core directly: the langchain.* re-exports (and langchain_openai/openai) cost seconds at import
+from langchain_core.prompts import PromptTemplate
+from langchain_core.tools import StructuredTool
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 import logging
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -14,6 +17,14 @@ from typing import List, Dict, Any
 from pydantic import BaseModel, Field  # Import Pydantic for schema definition
 from urllib.parse import urlparse
 from datetime import datetime
+from disk_cache import DiskCache
+from openrouter_health import openrouter_health
+from context_packer import pack_sources, unpacked_tokens
+from section_retrieval import ChunkIndex, chunk_sources, select_section_sources
+from report_model import parse_report
+from rate_limiter import AdaptiveRateLimiter
+from llm_transport import PREWARM, LLMTransport
+from tracing import span
 
 # Set up logging
 logging.basicConfig(filename="research_agent.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -21,11 +32,84 @@ logging.basicConfig(filename="research_agent.log", level=logging.INFO, format="%
 # Load environment variables from .env
 load_dotenv()
 
-# Initialize the ChatOpenAI client with OpenRouter
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-    model="cognitivecomputations/dolphin3.0-r1-mistral-24b:free"
+# ChatOpenAI client with OpenRouter (OPENROUTER_BASE_URL points it at a local stand-in)
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_MODEL = "cognitivecomputations/dolphin3.0-r1-mistral-24b:free"
+# Sampling parameters sent with every call (provider defaults); part of the section cache key
+LLM_SAMPLING = {"temperature": None, "top_p": None, "max_tokens": None}
+_llm = None
+llm_transport = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """Return the shared ChatOpenAI client, building it on first use.
+
+    Importing langchain_openai and opening the pooled transport is deferred to the
+    first draft, so importing this module (the UI, batch and API workers) stays fast.
+    Connections are not opened here: call prewarm_llm or aprewarm_llm when a run starts.
+    """
+    global _llm, llm_transport
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_openai import ChatOpenAI
+                # Pooled keep-alive transport shared by every section call (see llm_transport for the settings)
+                llm_transport = LLMTransport(OPENROUTER_BASE_URL)
+                _llm = ChatOpenAI(
+                    api_key=os.getenv("OPENROUTER_API_KEY"),
+                    base_url=OPENROUTER_BASE_URL,
+                    model=OPENROUTER_MODEL,
+                    **LLM_SAMPLING,
+                    timeout=llm_transport.timeout,
+                    http_client=llm_transport.client,
+                    http_async_client=llm_transport.async_client,
+                    max_retries=0  # Retries are handled per section in generate_section
+                )
+    return _llm
+
+def prewarm_llm():
+    """Build the LLM client and pre-warm the sync connection pool on a background thread.
+
+    For runs that draft through the sync client (draft_answer_stream); call it when research
+    starts, so the client import and the handshakes overlap the searches.
+    """
+    def warm():
+        get_llm()
+        if PREWARM and llm_transport is not None:
+            llm_transport.prewarm()
+
+    threading.Thread(target=warm, name="llm-prewarm", daemon=True).start()
+
+async def aprewarm_llm():
+    """Build the LLM client and pre-warm the running loop's connection pool, which async section calls use.
+
+    The sync pool is left cold: runs on this path never use it.
+    """
+    await asyncio.to_thread(get_llm)
+    if PREWARM and llm_transport is not None:
+        await llm_transport.aprewarm()
+
+# Shared limiter for every OpenRouter chat call made by this process (the free tier allows about 20 requests a minute)
+openrouter_limiter = AdaptiveRateLimiter(
+    "OpenRouter",
+    rate=float(os.getenv("OPENROUTER_RATE_LIMIT", str(20 / 60))),
+    burst=int(os.getenv("OPENROUTER_BURST", "6")),
+    max_concurrency=int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "6")),
+    latency_target=float(os.getenv("OPENROUTER_LATENCY_TARGET", "120"))
+)
+
+# Upper bound for a single exponential backoff wait between section retries
+RETRY_MAX_WAIT = float(os.getenv("DRAFT_RETRY_MAX_WAIT", "60"))
+
+# Bump whenever a section prompt template changes so cached completions are invalidated
+PROMPT_VERSION = "4"
+
+# Persistent cache of section completions, keyed by the fully rendered prompt
+SECTION_CACHE_ENABLED = os.getenv("SECTION_CACHE_ENABLED", "1") == "1"
+section_cache = DiskCache(
+    os.getenv("SECTION_CACHE_DIR", os.path.join("cache", "sections")),
+    ttl=float(os.getenv("SECTION_CACHE_TTL", str(7 * 24 * 60 * 60))),
+    max_entries=int(os.getenv("SECTION_CACHE_MAX_ENTRIES", "2000"))
 )
 
 # Writing style templates
@@ -52,24 +136,6 @@ STYLE_TEMPLATES = {
     }
 }
 
-# Citation formatting functions
-def format_citation(item: Dict[str, Any], format_style: str) -> str:
-    """Format citation according to specified style."""
-    title = item.get('title', '')
-    url = item.get('url', '')
-    # Extract domain as publisher
-    publisher = urlparse(url).netloc if url else "Unknown Publisher"
-    # Extract date or use current
-    date = datetime.now().strftime("%Y, %B %d")
-    
-    if format_style == "APA":
-        return f"{title}. ({date}). Retrieved from {url}"
-    elif format_style == "MLA":
-        return f'"{title}." {publisher}, {date}, {url}'
-    elif format_style == "IEEE":
-        return f"[{hash(url) % 100 + 1}] {title}, {publisher}, {date}."
-    return f"{title} - {url}"
-
 def apply_writing_style(prompt: str, style: str) -> str:
     """Apply writing style to prompt template."""
     style_config = STYLE_TEMPLATES.get(style, STYLE_TEMPLATES["academic"])
@@ -224,20 +290,195 @@ def format_key_findings(text):
     formatted_text = re.sub(r"\n{2,}", "\n", formatted_text)
     return formatted_text
 
-# Function to generate a section (for parallel processing)
-def generate_section(section_name, section_prompt, data_str, word_count):
-    """Generate a single section using the LLM."""
+# Retry helpers for section generation
+def is_retryable_error(exc):
+    """Return True for errors worth retrying (rate limits, timeouts, server and connection errors).
+
+    Anything else (bad messages, bugs in post-processing) fails the section at once.
+    """
+    import httpx
+    from openai import APIConnectionError, APIStatusError, APITimeoutError  # already loaded by the time a call has failed
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return isinstance(exc, (APIConnectionError, APITimeoutError, httpx.TransportError))
+
+def get_retry_after(exc):
+    """Extract the Retry-After delay in seconds from an API error, if the server sent one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
     try:
-        formatted_prompt = section_prompt.format(data=data_str, word_count=word_count)
-        messages = [{"role": "user", "content": formatted_prompt}]
-        response = llm.invoke(messages)
-        section_text = clean_think_tags(response.content.strip())
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(tz=retry_at.tzinfo)).total_seconds())
+
+def retry_wait(delay):
+    """Build a tenacity wait: honor Retry-After when present, else exponential backoff with full jitter.
+
+    Both are capped at RETRY_MAX_WAIT, so a large Retry-After cannot park a worker.
+    """
+    backoff = wait_random_exponential(multiplier=delay, max=RETRY_MAX_WAIT)
+
+    def wait(retry_state):
+        retry_after = get_retry_after(retry_state.outcome.exception())
+        if retry_after is not None:
+            return min(retry_after + random.uniform(0, 1), RETRY_MAX_WAIT)
+        return backoff(retry_state)
+
+    return wait
+
+def log_retry(section_name):
+    """Build a tenacity before_sleep hook that logs the failed attempt of a section."""
+    def before_sleep(retry_state):
+        exc = retry_state.outcome.exception()
+        logging.warning(
+            f"Retrying section {section_name} (attempt {retry_state.attempt_number} failed: "
+            f"{type(exc).__name__} - {str(exc)}), waiting {retry_state.next_action.sleep:.1f}s"
+        )
+    return before_sleep
+
+def section_retrying(section_name, retries, delay, retrying_cls=Retrying):
+    """Build the per-section tenacity retry policy (sync or async)."""
+    return retrying_cls(
+        stop=stop_after_attempt(max(1, retries)),
+        wait=retry_wait(delay),
+        retry=retry_if_exception(is_retryable_error),
+        after=lambda retry_state: openrouter_health.record_failure(),
+        before_sleep=log_retry(section_name),
+        reraise=True
+    )
+
+def postprocess_section(section_name, content):
+    """Clean up a raw LLM section response."""
+    with span("postprocess", section=section_name):
+        section_text = clean_think_tags(content.strip())
         if section_name == "Key Findings":
             section_text = format_key_findings(section_text)
-        return section_name, section_text
-    except Exception as e:
-        logging.error(f"Error generating section {section_name}: {str(e)}")
-        return section_name, f"Error generating section: {str(e)}"
+        return section_text
+
+def section_cache_key(messages):
+    """Content address of a section completion: prompt version, model, sampling parameters and messages."""
+    # Built from the configuration rather than the client, so cache hits never construct it
+    return section_cache.make_key(PROMPT_VERSION, OPENROUTER_MODEL, LLM_SAMPLING, messages)
+
+def get_cached_completion(messages):
+    """Return (cache key, cached completion or None)."""
+    if not SECTION_CACHE_ENABLED:
+        return None, None
+    key = section_cache_key(messages)
+    return key, section_cache.get(key)
+
+def store_completion(key, content):
+    """Store a section completion under its content address."""
+    if key is not None and content:
+        section_cache.set(key, content)
+
+# Function to generate a section (for parallel processing)
+def generate_section(section_name, messages, retries=3, delay=5):
+    """Generate a single section using the LLM, retrying only this section on transient errors."""
+    with span("section", section=section_name) as section_span:
+        key, content = get_cached_completion(messages)
+        section_span.set(cached=content is not None)
+        if content is None:
+            for attempt in section_retrying(section_name, retries, delay):
+                with attempt, openrouter_limiter.limit():
+                    section_span.set(attempts=attempt.retry_state.attempt_number)
+                    response = get_llm().invoke(messages)
+            openrouter_health.record_success()
+            content = response.content
+            store_completion(key, content)
+    return section_name, postprocess_section(section_name, content)
+
+async def agenerate_section(section_name, messages, retries=3, delay=5):
+    """Async variant of generate_section built on ChatOpenAI.ainvoke."""
+    with span("section", section=section_name) as section_span:
+        # Disk reads and writes run on a worker thread, off the event loop
+        key, content = await asyncio.to_thread(get_cached_completion, messages)
+        section_span.set(cached=content is not None)
+        if content is None:
+            async for attempt in section_retrying(section_name, retries, delay, AsyncRetrying):
+                with attempt:
+                    section_span.set(attempts=attempt.retry_state.attempt_number)
+                    async with openrouter_limiter.alimit():
+                        response = await get_llm().ainvoke(messages)
+            openrouter_health.record_success()
+            content = response.content
+            await asyncio.to_thread(store_completion, key, content)
+    return section_name, postprocess_section(section_name, content)
+
+def stream_section(section_name, messages, emit, retries=3, delay=5):
+    """Stream a section through llm.stream, emitting (section_name, event, text) tuples; return the cleaned text.
+
+    Emits "token" for each raw chunk and "retry" when a failed attempt restarts the section.
+    """
+    with span("section", section=section_name, streamed=True) as section_span:
+        key, content = get_cached_completion(messages)
+        section_span.set(cached=content is not None)
+        if content is None:
+            for attempt in section_retrying(section_name, retries, delay):
+                with attempt:
+                    section_span.set(attempts=attempt.retry_state.attempt_number)
+                    if attempt.retry_state.attempt_number > 1:
+                        emit((section_name, "retry", ""))
+                    parts = []
+                    with openrouter_limiter.limit():
+                        for chunk in get_llm().stream(messages):
+                            parts.append(chunk.content)
+                            emit((section_name, "token", chunk.content))
+                    content = "".join(parts)
+            openrouter_health.record_success()
+            store_completion(key, content)
+        else:
+            emit((section_name, "token", content))
+    return postprocess_section(section_name, content)
+
+async def astream_section(section_name, messages, emit, retries=3, delay=5):
+    """Async variant of stream_section built on llm.astream."""
+    with span("section", section=section_name, streamed=True) as section_span:
+        # Disk reads and writes run on a worker thread, off the event loop
+        key, content = await asyncio.to_thread(get_cached_completion, messages)
+        section_span.set(cached=content is not None)
+        if content is None:
+            async for attempt in section_retrying(section_name, retries, delay, AsyncRetrying):
+                with attempt:
+                    section_span.set(attempts=attempt.retry_state.attempt_number)
+                    if attempt.retry_state.attempt_number > 1:
+                        emit((section_name, "retry", ""))
+                    parts = []
+                    async with openrouter_limiter.alimit():
+                        async for chunk in get_llm().astream(messages):
+                            parts.append(chunk.content)
+                            emit((section_name, "token", chunk.content))
+                    content = "".join(parts)
+            openrouter_health.record_success()
+            await asyncio.to_thread(store_completion, key, content)
+        else:
+            emit((section_name, "token", content))
+    return postprocess_section(section_name, content)
+
+# Maximum number of sections drafted at the same time
+DRAFT_MAX_CONCURRENCY = int(os.getenv("DRAFT_MAX_CONCURRENCY", "6"))
+
+# Token budget for the source material embedded in each section prompt
+SECTION_CONTEXT_TOKENS = int(os.getenv("SECTION_CONTEXT_TOKENS", "6000"))
+
+# Number of most relevant research chunks each section receives (0 disables retrieval)
+SECTION_TOP_K = int(os.getenv("SECTION_TOP_K", "8"))
 
 # Define the schema for StructuredTool arguments using Pydantic
 class DraftAnswerArgs(BaseModel):
@@ -247,8 +488,10 @@ class DraftAnswerArgs(BaseModel):
     writing_style: str = Field(default="academic", description="Writing style for the summary")
     citation_format: str = Field(default="APA", description="Citation format for references")
     language: str = Field(default="english", description="Language for the summary")
-    retries: int = Field(default=3, description="Number of retries for API calls")
-    delay: int = Field(default=5, description="Delay between retries in seconds")
+    retries: int = Field(default=3, description="Maximum number of attempts per section")
+    delay: int = Field(default=5, description="Base delay in seconds for exponential backoff between section retries")
+    max_concurrency: int = Field(default=DRAFT_MAX_CONCURRENCY, description="Maximum number of sections drafted concurrently (1 drafts sequentially)")
+    query: str = Field(default="", description="Original research query, used to retrieve the most relevant sources per section")
 
 STYLE_PROMPTS = {
     "academic": """Write in a formal academic style with:
@@ -303,8 +546,8 @@ LANGUAGE_PROMPTS = {
         - 保持正式的学术语气""",
 }
 
-def format_citation(source: Dict[str, str], style: str) -> str:
-    """Format citation based on selected style."""
+def format_citation(source: Dict[str, str], style: str, number: int = 1) -> str:
+    """Format citation based on selected style; number is the source's 1-based position (IEEE labels)."""
     title = source.get('title', '')
     url = source.get('url', '')
     date = datetime.now().strftime("%Y, %B %d")
@@ -313,11 +556,143 @@ def format_citation(source: Dict[str, str], style: str) -> str:
     citations = {
         "APA": f"{title}. ({date}). Retrieved from {url}",
         "MLA": f'"{title}." {domain}. {date}. Web.',
-        "IEEE": f"[{hash(url) % 100 + 1}] {title}. {domain}. {date}.",
+        "IEEE": f"[{number}] {title}. {domain}. {date}.",
     }
     
     return citations.get(style, citations["APA"])
 
+def get_section_prompts(deep_research: bool = False) -> list:
+    """Return [(section_name, prompt), ...] in canonical report order."""
+    if not deep_research:
+        return [
+            ("Key Findings", key_findings_prompt),
+            ("Analysis", analysis_prompt)
+        ]
+    return [
+        ("Abstract", abstract_prompt),
+        ("Introduction", introduction_prompt),
+        ("Literature Review", literature_review_prompt),
+        ("Key Findings", key_findings_prompt),
+        ("Analysis", analysis_prompt),
+        ("Conclusion", conclusion_prompt)
+    ]
+
+def get_section_names(deep_research: bool = False) -> list:
+    """Return the section names drafted in the given mode, in canonical order."""
+    return [section_name for section_name, _ in get_section_prompts(deep_research)]
+
+# Build the ordered section prompts and the citations shared by draft_answer and adraft_answer
+def prepare_sections(
+    data: List[Dict[str, Any]],
+    deep_research: bool = False,
+    target_word_count: int = 1000,
+    writing_style: str = "academic",
+    citation_format: str = "APA",
+    language: str = "english",
+    query: str = ""
+) -> tuple:
+    """Return ([(section_name, messages), ...] in canonical order, citations).
+
+    The prompts do not depend on citation_format: sources are numbered by title and
+    URL, and the formatted citations only go into the References block.
+    """
+    citations = format_references(data, citation_format)
+
+    # Index the research chunks once; each section then only gets its top-k chunks
+    chunks = chunk_sources(data)
+    index = ChunkIndex(chunks) if 0 < SECTION_TOP_K < len(chunks) else None
+
+    original_tokens = unpacked_tokens(data, citations)
+
+    def section_context(section_name):
+        """Pack the sources relevant to one section into the per-section token budget."""
+        if index is None:
+            items, source_numbers = data, None
+        else:
+            items, source_numbers = select_section_sources(index, data, section_name, query, SECTION_TOP_K)
+        packed = pack_sources(items, SECTION_CONTEXT_TOKENS, source_numbers, original_tokens)
+        logging.info(
+            f"Section {section_name}: packed {len(items)} of {len(data)} sources into ~{packed['tokens']} tokens "
+            f"(saved ~{packed['saved_tokens']} of ~{packed['original_tokens']}, {packed['truncated_items']} truncated)"
+        )
+        return packed["text"]
+
+    # Modify prompts with style and language
+    sections = [
+        (section_name, apply_writing_style(prompt.template, writing_style))
+        for section_name, prompt in get_section_prompts(deep_research)
+    ]
+
+    # Add language instruction to system message
+    system_message = f"Please provide the response in {language}. "
+    system_message += "Refer to sources by their bracketed numbers (e.g. [1]), which match the References list."
+
+    section_messages = [
+        (section_name, [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt_template.format(
+                data=section_context(section_name),
+                word_count=target_word_count // len(sections)
+            )}
+        ])
+        for section_name, prompt_template in sections
+    ]
+    return section_messages, citations
+
+# Inputs each reusable stage of a run depends on, in pipeline order. A stage whose inputs (and whose
+# upstream stages) are unchanged since the previous run can reuse that run's output.
+STAGE_INPUTS = {
+    "research": ("query", "deep_research"),
+    "sections": ("query", "deep_research", "target_word_count", "writing_style", "language"),
+}
+
+def reusable_stages(previous_params: dict, params: dict) -> list:
+    """Return the stages whose output from a run with previous_params is still valid for params.
+
+    References are deterministic and cheap, so they are always re-rendered and never listed.
+    """
+    reusable = []
+    for stage in STAGE_INPUTS:
+        if any(previous_params.get(name) != params.get(name) for name in STAGE_INPUTS[stage]):
+            break
+        reusable.append(stage)
+    return reusable
+
+REFERENCES_HEADING = "\n\n**References**\n\n"
+
+def format_references(data: List[Dict[str, Any]], citation_format: str = "APA") -> list:
+    """Format the References entries for the research data, in source order.
+
+    Entries are numbered by position, like the [n] source headers in the section prompts.
+    """
+    return [format_citation(item, citation_format, number) for number, item in enumerate(data, 1)]
+
+def rerender_references(response_text: str, data: List[Dict[str, Any]], citation_format: str = "APA") -> str:
+    """Replace the References block of a drafted response, keeping the drafted sections (no LLM calls)."""
+    sections_text, heading, _ = response_text.rpartition(REFERENCES_HEADING)
+    if not heading:
+        raise ValueError("response has no References block")
+    return sections_text + REFERENCES_HEADING + "\n".join(format_references(data, citation_format))
+
+def assemble_response(section_names, section_texts, failed_sections, citations) -> str:
+    """Join drafted sections in canonical order and append the References block."""
+    if failed_sections:
+        # Failures are exceptions, or already-formatted messages from the workflow's section nodes
+        details = "; ".join(
+            f"{name}: {e if isinstance(e, str) else f'{type(e).__name__} - {str(e)}'}" for name, e in failed_sections.items()
+        )
+        raise Exception(f"Failed to generate {len(failed_sections)} of {len(section_names)} sections ({details})")
+
+    # Reassemble sections in their canonical order
+    response_text = ""
+    for section_name in section_names:
+        response_text += f"\n\n**{section_name}**\n\n{section_texts[section_name]}"
+
+    # Add References section
+    response_text += REFERENCES_HEADING
+    response_text += "\n".join(citations)
+    return response_text
+
 # Drafting function with retry logic and deep research support
 def draft_answer(
     data: List[Dict[str, Any]], 
@@ -327,82 +702,226 @@ def draft_answer(
     citation_format: str = "APA",
     language: str = "english",
     retries: int = 3, 
-    delay: int = 5
+    delay: int = 5,
+    max_concurrency: int = DRAFT_MAX_CONCURRENCY,
+    query: str = ""
 ) -> str:
     """Enhanced draft function with style, citations, and language support."""
     if not data:
         return "Error drafting response: No research data provided"
 
-    attempt = 0
-    while attempt < retries:
-        try:
-            data_str = json.dumps(data)
-            
-            # Add citations to data
-            citations = [format_citation(item, citation_format) for item in data]
-            data_with_citations = {
-                "content": data_str,
-                "citations": citations,
-                "style": writing_style,
-                "language": language
+    try:
+        section_messages, citations = prepare_sections(
+            data, deep_research, target_word_count, writing_style, citation_format, language, query
+        )
+
+        # Draft sections concurrently; total latency is close to the slowest section.
+        # Each section retries on its own, so finished sections are never requested again.
+        section_texts = {}
+        failed_sections = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(section_messages)))) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, generate_section, section_name, messages, retries, delay): section_name
+                for section_name, messages in section_messages
             }
+            for future in as_completed(futures):
+                section_name = futures[future]
+                try:
+                    _, section_texts[section_name] = future.result()
+                except Exception as e:
+                    logging.error(f"Error generating section {section_name}: {str(e)}")
+                    failed_sections[section_name] = e
+
+        response_text = assemble_response([name for name, _ in section_messages], section_texts, failed_sections, citations)
+        return response_text
 
-            # Modify prompts with style and language
-            if not deep_research:
-                sections = [
-                    ("Key Findings", apply_writing_style(key_findings_prompt.template, writing_style)),
-                    ("Analysis", apply_writing_style(analysis_prompt.template, writing_style))
-                ]
+    except Exception as e:
+        return f"Error drafting response: {type(e).__name__} - {str(e)}"
+
+async def adraft_answer(
+    data: List[Dict[str, Any]], 
+    deep_research: bool = False, 
+    target_word_count: int = 1000,
+    writing_style: str = "academic",
+    citation_format: str = "APA",
+    language: str = "english",
+    retries: int = 3, 
+    delay: int = 5,
+    max_concurrency: int = DRAFT_MAX_CONCURRENCY,
+    query: str = ""
+) -> str:
+    """Async variant of draft_answer: sections run as tasks on the event loop, bounded by a semaphore."""
+    if not data:
+        return "Error drafting response: No research data provided"
+
+    try:
+        section_messages, citations = prepare_sections(
+            data, deep_research, target_word_count, writing_style, citation_format, language, query
+        )
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def bounded_section(section_name, messages):
+            async with semaphore:
+                return await agenerate_section(section_name, messages, retries, delay)
+
+        results = await asyncio.gather(
+            *(bounded_section(section_name, messages) for section_name, messages in section_messages),
+            return_exceptions=True
+        )
+
+        section_texts = {}
+        failed_sections = {}
+        for (section_name, _), result in zip(section_messages, results):
+            if isinstance(result, BaseException):
+                logging.error(f"Error generating section {section_name}: {str(result)}")
+                failed_sections[section_name] = result
             else:
-                sections = [
-                    ("Abstract", apply_writing_style(abstract_prompt.template, writing_style)),
-                    ("Introduction", apply_writing_style(introduction_prompt.template, writing_style)),
-                    ("Literature Review", apply_writing_style(literature_review_prompt.template, writing_style)),
-                    ("Key Findings", apply_writing_style(key_findings_prompt.template, writing_style)),
-                    ("Analysis", apply_writing_style(analysis_prompt.template, writing_style)),
-                    ("Conclusion", apply_writing_style(conclusion_prompt.template, writing_style))
-                ]
-
-            # Add language instruction to system message
-            system_message = f"Please provide the response in {language}. "
-            system_message += f"Use {citation_format} citation format when referencing sources."
-
-            response_text = ""
-            for section_name, prompt_template in sections:
-                messages = [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt_template.format(
-                        data=json.dumps(data_with_citations),
-                        word_count=target_word_count // len(sections)
-                    )}
-                ]
-                
-                response = llm.invoke(messages)
-                section_text = clean_think_tags(response.content.strip())
-                
-                if section_name == "Key Findings":
-                    section_text = format_key_findings(section_text)
-                
-                response_text += f"\n\n**{section_name}**\n\n{section_text}"
-
-            # Add References section
-            response_text += "\n\n**References**\n\n"
-            response_text += "\n".join(citations)
-
-            return response_text
+                section_texts[section_name] = result[1]
+
+        response_text = assemble_response([name for name, _ in section_messages], section_texts, failed_sections, citations)
+        return response_text
+
+    except Exception as e:
+        return f"Error drafting response: {type(e).__name__} - {str(e)}"
+
+def draft_answer_stream(
+    data: List[Dict[str, Any]], 
+    deep_research: bool = False, 
+    target_word_count: int = 1000,
+    writing_style: str = "academic",
+    citation_format: str = "APA",
+    language: str = "english",
+    retries: int = 3, 
+    delay: int = 5,
+    max_concurrency: int = DRAFT_MAX_CONCURRENCY,
+    query: str = ""
+):
+    """Streaming mode of draft_answer: yield (section_name, event, text) tuples as sections are drafted.
+
+    Events: "token" (raw chunk), "retry" (discard the section's partial text), "section"
+    (cleaned final section text), "error" (section failed), (None, "report", Report) when
+    the draft succeeded, and finally (None, "done", text), where text is exactly what
+    draft_answer returns for the same completions.
+    """
+    if not data:
+        yield None, "done", "Error drafting response: No research data provided"
+        return
 
+    try:
+        section_messages, citations = prepare_sections(
+            data, deep_research, target_word_count, writing_style, citation_format, language, query
+        )
+    except Exception as e:
+        yield None, "done", f"Error drafting response: {type(e).__name__} - {str(e)}"
+        return
+
+    events = queue.Queue()
+
+    def worker(section_name, messages):
+        try:
+            events.put((section_name, "section", stream_section(section_name, messages, events.put, retries, delay)))
         except Exception as e:
-            attempt += 1
-            if attempt < retries:
-                time.sleep(delay)
-                continue
-            return f"Error drafting response: {type(e).__name__} - {str(e)}"
-    
-    return "Error drafting response: Max retries exceeded."
+            events.put((section_name, "failed", e))
+
+    section_texts = {}
+    failed_sections = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(section_messages))))
+    try:
+        for section_name, messages in section_messages:
+            # Run each section in a copy of this context so its spans nest under the caller's
+            executor.submit(contextvars.copy_context().run, worker, section_name, messages)
+        pending = len(section_messages)
+        while pending:
+            section_name, event, payload = events.get()
+            if event == "section":
+                section_texts[section_name] = payload
+                pending -= 1
+            elif event == "failed":
+                logging.error(f"Error generating section {section_name}: {str(payload)}")
+                failed_sections[section_name] = payload
+                pending -= 1
+                event, payload = "error", f"Error generating section: {type(payload).__name__} - {str(payload)}"
+            yield section_name, event, payload
+    finally:
+        # Stop queued sections if the consumer goes away before the draft is complete
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    try:
+        response_text = assemble_response([name for name, _ in section_messages], section_texts, failed_sections, citations)
+    except Exception as e:
+        response_text = f"Error drafting response: {type(e).__name__} - {str(e)}"
+    else:
+        yield None, "report", parse_report(response_text)
+    yield None, "done", response_text
+
+async def adraft_answer_stream(
+    data: List[Dict[str, Any]], 
+    deep_research: bool = False, 
+    target_word_count: int = 1000,
+    writing_style: str = "academic",
+    citation_format: str = "APA",
+    language: str = "english",
+    retries: int = 3, 
+    delay: int = 5,
+    max_concurrency: int = DRAFT_MAX_CONCURRENCY,
+    query: str = ""
+):
+    """Async variant of draft_answer_stream built on llm.astream."""
+    if not data:
+        yield None, "done", "Error drafting response: No research data provided"
+        return
+
+    try:
+        section_messages, citations = prepare_sections(
+            data, deep_research, target_word_count, writing_style, citation_format, language, query
+        )
+    except Exception as e:
+        yield None, "done", f"Error drafting response: {type(e).__name__} - {str(e)}"
+        return
+
+    events = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def worker(section_name, messages):
+        try:
+            async with semaphore:
+                text = await astream_section(section_name, messages, events.put_nowait, retries, delay)
+            events.put_nowait((section_name, "section", text))
+        except Exception as e:
+            events.put_nowait((section_name, "failed", e))
+
+    section_texts = {}
+    failed_sections = {}
+    tasks = [asyncio.ensure_future(worker(section_name, messages)) for section_name, messages in section_messages]
+    try:
+        pending = len(section_messages)
+        while pending:
+            section_name, event, payload = await events.get()
+            if event == "section":
+                section_texts[section_name] = payload
+                pending -= 1
+            elif event == "failed":
+                logging.error(f"Error generating section {section_name}: {str(payload)}")
+                failed_sections[section_name] = payload
+                pending -= 1
+                event, payload = "error", f"Error generating section: {type(payload).__name__} - {str(payload)}"
+            yield section_name, event, payload
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    try:
+        response_text = assemble_response([name for name, _ in section_messages], section_texts, failed_sections, citations)
+    except Exception as e:
+        response_text = f"Error drafting response: {type(e).__name__} - {str(e)}"
+    else:
+        yield None, "report", parse_report(response_text)
+    yield None, "done", response_text
 
 # Define the tool with support for deep research and target word count using StructuredTool
 draft_tool = StructuredTool.from_function(
     func=draft_answer,
+    coroutine=adraft_answer,
     name="DraftAnswer",
     description="Drafts a structured research summary based on research data. Supports deep research mode for detailed summaries and customizable word count.",
     args_schema=DraftAnswerArgs
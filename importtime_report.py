@@ -0,0 +1,110 @@
+"""Import-time report for the project's entry modules, from `python -X importtime`.
+
+Imports each module in a fresh interpreter and reports its total import time
+and the heaviest packages it pulls in, so the startup cost of new workers
+(UI, batch, API) can be watched and kept low:
+
+    python importtime_report.py
+    python importtime_report.py main api_server --top 15 --json -o importtime.json
+    python importtime_report.py --max-ms 1500   # exit 1 when any module is slower
+
+Times vary between runs; compare medians over --repeats when tracking changes.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+MODULES = ("research_agent", "draft_agent", "report_exports", "main", "batch_research", "background_jobs", "api_server")
+
+def parse_importtime(stderr: str) -> list:
+    """Parse `-X importtime` lines into (module, depth, self_us, cumulative_us) tuples; depth 0 is top level."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2  # one space, then two per nesting level
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+def measure_module(module: str) -> dict:
+    """Import module in a fresh interpreter and return its import time and top-level dependencies."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()
+        return {"module": module, "error": error[-1] if error else f"exit status {process.returncode}"}
+
+    entries = parse_importtime(process.stderr)
+    # Children are logged before their parent, so the module's imports are the lines since the
+    # previous top-level entry (the interpreter's own startup imports come first)
+    end = max(index for index, (name, depth, _, _) in enumerate(entries) if name == module and depth == 0)
+    start = max([index for index, (_, depth, _, _) in enumerate(entries[:end]) if depth == 0], default=-1) + 1
+    packages = {}
+    for name, depth, _, cumulative in entries[start:end]:
+        if depth == 1:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + cumulative
+    return {
+        "module": module,
+        "total_ms": entries[end][3] / 1000,
+        "modules_imported": end - start + 1,
+        "packages": {package: cumulative / 1000 for package, cumulative in packages.items()},
+    }
+
+def report_module(module: str, repeats: int = 1, top: int = 10) -> dict:
+    """Median import time over repeats, with the slowest packages of the median run."""
+    runs = [measure_module(module) for _ in range(max(1, repeats))]
+    failed = [run for run in runs if "error" in run]
+    if failed:
+        return failed[0]
+    runs.sort(key=lambda run: run["total_ms"])
+    median = runs[len(runs) // 2]
+    slowest = sorted(median["packages"].items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(statistics.median(run["total_ms"] for run in runs), 1),
+        "modules_imported": median["modules_imported"],
+        "slowest_packages": [{"package": package, "ms": round(ms, 1)} for package, ms in slowest],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import time of the project's entry modules.")
+    parser.add_argument("modules", nargs="*", default=list(MODULES), help=f"modules to import (default: {' '.join(MODULES)})")
+    parser.add_argument("--top", type=int, default=8, help="slowest packages listed per module (default: 8)")
+    parser.add_argument("--repeats", type=int, default=3, help="fresh imports per module; the median is reported (default: 3)")
+    parser.add_argument("--max-ms", type=float, help="fail when any module takes longer to import")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("-o", "--output", help="also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    results = [report_module(module, args.repeats, args.top) for module in args.modules]
+    failed = [result for result in results if "error" in result]
+    too_slow = [result for result in results
+                if args.max_ms is not None and "error" not in result and result["total_ms"] > args.max_ms]
+
+    report = {"python": sys.version.split()[0], "max_ms": args.max_ms, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        for result in results:
+            if "error" in result:
+                print(f"{result['module']:<18} import failed: {result['error']}")
+                continue
+            print(f"{result['module']:<18} {result['total_ms']:>8.1f} ms  ({result['modules_imported']} modules)")
+            for package in result["slowest_packages"]:
+                print(f"    {package['package']:<24} {package['ms']:>8.1f} ms")
+    for result in too_slow:
+        print(f"SLOW {result['module']}: {result['total_ms']} ms > {args.max_ms} ms", file=sys.stderr)
+    return 1 if failed or too_slow else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import os
+import time
+import importlib.util
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# Timeouts (seconds) for OpenRouter calls; the read timeout bounds the wait for each streamed chunk
+CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "120"))
+WRITE_TIMEOUT = float(os.getenv("OPENROUTER_WRITE_TIMEOUT", "30"))
+POOL_TIMEOUT = float(os.getenv("OPENROUTER_POOL_TIMEOUT", "30"))
+
+# Keep-alive pool sizing (per client, and per event loop for the async client)
+MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "90"))
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2 = os.getenv("OPENROUTER_HTTP2", "0") == "1"
+
+# Connections opened (TCP + TLS) in the background when a run starts, so its first section calls skip the handshake
+PREWARM = os.getenv("OPENROUTER_PREWARM", "1") == "1"
+PREWARM_CONNECTIONS = int(os.getenv("OPENROUTER_PREWARM_CONNECTIONS", "4"))
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+class ConnectionStats:
+    """Counts requests and whether each one opened a new connection or reused a pooled one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.http_versions = {}
+
+    def record(self, request: httpx.Request, response: httpx.Response, new_connection: bool):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += new_connection
+            self.http_versions[response.http_version] = self.http_versions.get(response.http_version, 0) + 1
+        logging.debug(f"OpenRouter {request.method} {request.url.path}: {response.status_code} over {'a new' if new_connection else 'a reused'} {response.http_version} connection")
+
+    def stats(self) -> dict:
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0,
+                "http_versions": dict(self.http_versions),
+            }
+
+class ConnectionTrace:
+    """httpcore trace callback noting whether the request had to open a TCP connection."""
+
+    def __init__(self):
+        self.new_connection = False
+
+    def __call__(self, event_name, info):
+        if event_name.endswith("connect_tcp.started"):
+            self.new_connection = True
+
+class AsyncConnectionTrace(ConnectionTrace):
+    async def __call__(self, event_name, info):
+        ConnectionTrace.__call__(self, event_name, info)
+
+# Every LoopLocalAsyncTransport, so a finishing loop can close its pools in all of them
+_loop_local_transports = weakref.WeakSet()
+
+class LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """Async transport keeping one connection pool per event loop.
+
+    Pooled connections are bound to the loop that opened them, and every
+    asyncio.run() (e.g. each run_research call) starts a new loop; sharing one
+    pool across loops fails with "Event loop is closed" on reuse. A loop's pool
+    must be closed on that loop before it finishes (see aclose_loop_transports).
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._lock = threading.Lock()
+        self._transports = weakref.WeakKeyDictionary()
+        _loop_local_transports.add(self)
+
+    def _current(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current().handle_async_request(request)
+
+    async def aclose(self):
+        """Close the running loop's pool; a later request on this loop opens a new one."""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+async def aclose_loop_transports():
+    """Close the pools every LoopLocalAsyncTransport holds for the running loop.
+
+    Await this at the end of a short-lived loop (the tail of an asyncio.run coroutine):
+    once the loop is closed its connections can no longer be shut down cleanly.
+    """
+    for transport in list(_loop_local_transports):
+        await transport.aclose()
+
+class LLMTransport:
+    """Pooled, keep-alive httpx clients (sync and async) for the OpenRouter ChatOpenAI client."""
+
+    def __init__(self, base_url: str, http2: bool = HTTP2):
+        self.base_url = base_url
+        if http2 and not http2_available():
+            logging.warning("OPENROUTER_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+        self.connection_stats = ConnectionStats()
+        self.client = httpx.Client(
+            timeout=self.timeout,
+            transport=httpx.HTTPTransport(limits=limits, http2=http2),
+            event_hooks={"request": [self._trace_request], "response": [self._record_response]}
+        )
+        self.async_client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=LoopLocalAsyncTransport(limits=limits, http2=http2),
+            event_hooks={"request": [self._atrace_request], "response": [self._arecord_response]}
+        )
+
+    def _trace_request(self, request: httpx.Request):
+        request.extensions["trace"] = ConnectionTrace()
+
+    async def _atrace_request(self, request: httpx.Request):
+        request.extensions["trace"] = AsyncConnectionTrace()
+
+    def _record_response(self, response: httpx.Response):
+        request = response.request
+        if not request.extensions.get("prewarm"):
+            self.connection_stats.record(request, response, request.extensions["trace"].new_connection)
+
+    async def _arecord_response(self, response: httpx.Response):
+        self._record_response(response)
+
+    async def aprewarm(self, connections: int = PREWARM_CONNECTIONS):
+        """Open `connections` keep-alive connections in the running loop's async pool.
+
+        Async calls (the workflow's section nodes) use a separate pool per event loop, which
+        prewarm() does not touch; await this on the loop that will make the calls.
+        """
+        async def open_connection():
+            try:
+                await self.async_client.head(self.base_url, extensions={"prewarm": True})
+            except httpx.HTTPError as e:
+                logging.warning(f"Failed to pre-warm OpenRouter connection: {str(e)}")
+
+        started = time.monotonic()
+        await asyncio.gather(*(open_connection() for _ in range(connections)))
+        logging.info(f"Pre-warmed {connections} async OpenRouter connections in {time.monotonic() - started:.2f}s")
+
+    def _open_connection(self):
+        try:
+            self.client.head(self.base_url, extensions={"prewarm": True})
+        except httpx.HTTPError as e:
+            logging.warning(f"Failed to pre-warm OpenRouter connection: {str(e)}")
+
+    def prewarm(self, connections: int = PREWARM_CONNECTIONS):
+        """Open `connections` keep-alive connections on a background thread (does not block startup)."""
+        def warm():
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                for _ in range(connections):
+                    executor.submit(self._open_connection)
+            logging.info(f"Pre-warmed {connections} OpenRouter connections in {time.monotonic() - started:.2f}s")
+        threading.Thread(target=warm, name="openrouter-prewarm", daemon=True).start()
+
+    def stats(self) -> dict:
+        """Connection-reuse statistics of the LLM calls made so far."""
+        return self.connection_stats.stats()
@@ -1,79 +1,238 @@
-from langgraph.graph import Graph
-from research_agent import research_tool
-from draft_agent import draft_tool
-from joblib import Memory
+import os
+import uuid
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Dict, List, TypedDict
+from research_agent import ResearchSession, research_tool
+from draft_agent import (
+    DRAFT_MAX_CONCURRENCY, agenerate_section, aprewarm_llm, assemble_response, prepare_sections
+)
+from disk_cache import DiskCache
+from llm_transport import aclose_loop_transports
+from run_checkpoints import run_checkpoints
+from tracing import span, trace_run
 
-# Initialize caching with joblib
-memory = Memory("cache", verbose=0)
-memory.clear()  # Clear the cache
+# Persistent research cache shared by every process using the same directory
+research_cache = DiskCache(
+    os.getenv("RESEARCH_CACHE_DIR", os.path.join("cache", "research")),
+    ttl=float(os.getenv("RESEARCH_CACHE_TTL", str(24 * 60 * 60))),
+    max_entries=int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "500"))
+)
+
+def research_cache_key(query: str, deep_research: bool = False) -> str:
+    """Build the research cache key from the normalized query and the research mode."""
+    normalized_query = " ".join(query.lower().split())
+    return research_cache.make_key(normalized_query, "deep" if deep_research else "quick")
+
+def check_research_result(result) -> list:
+    """Raise if the research tool reported an error instead of returning data."""
+    if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict) and "error" in result[0]:
+        raise Exception(f"Research failed: {result[0]['error']}")
+    return result
 
 # Define the research node to update the state
-@memory.cache
 def fetch_research_data(query: str, deep_research: bool = False) -> list:
     """Fetch research data using the research tool with caching."""
-    result = research_tool.run(query, deep_research=deep_research)
-    if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict) and "error" in result[0]:
-        raise Exception(f"Research failed: {result[0]['error']}")
+    key = research_cache_key(query, deep_research)
+    cached = research_cache.get(key)
+    if cached is not None:
+        return cached
+    result = check_research_result(research_tool.func(query, deep_research))
+    if result:
+        research_cache.set(key, result)
+    return result
+
+async def afetch_research_data(query: str, deep_research: bool = False) -> list:
+    """Async variant of fetch_research_data: serve from the cache or await the async research path.
+
+    Cache reads and writes touch the disk (and a cross-process lock), so they run on a worker thread.
+    """
+    key = research_cache_key(query, deep_research)
+    cached = await asyncio.to_thread(research_cache.get, key)
+    if cached is not None:
+        return cached
+    result = check_research_result(await research_tool.coroutine(query, deep_research))
+    if result:
+        await asyncio.to_thread(research_cache.set, key, result)
     return result
 
-def research_node(state):
-    """Fetch research data and update the state."""
+def merge_dicts(left: dict, right: dict) -> dict:
+    """State reducer: merge the per-section outputs written by parallel section nodes."""
+    return {**(left or {}), **(right or {})}
+
+class ResearchState(TypedDict, total=False):
+    """Workflow state; section nodes run in parallel and write through the merge_dicts reducers."""
+    run_id: str
+    query: str
+    deep_research: bool
+    target_word_count: int
+    writing_style: str
+    citation_format: str
+    language: str
+    research: List[Dict[str, Any]]
+    research_session: Any
+    section_plan: List[Any]
+    citations: List[str]
+    sections: Annotated[Dict[str, str], merge_dicts]
+    failed_sections: Annotated[Dict[str, str], merge_dicts]
+    draft: str
+
+async def research_node(state):
+    """Serve research from the run checkpoint or the cache, or start a research session with the initial search."""
     query = state["query"]
     deep_research = state.get("deep_research", False)
-    research_data = fetch_research_data(query, deep_research)
-    state["research"] = research_data
-    return state
+    # Build the LLM client and pre-warm this loop's connections (used by the section nodes) while the searches are in flight
+    llm_ready = asyncio.ensure_future(aprewarm_llm())
+    if state.get("research") is not None:
+        # Resumed run: the research stage was restored from its checkpoint
+        await llm_ready
+        return {}
+    with span("research", deep_research=deep_research) as research_span:
+        cached = await asyncio.to_thread(research_cache.get, research_cache_key(query, deep_research))
+        if cached is not None:
+            update = {"research": cached}
+        else:
+            session = ResearchSession(query, deep_research)
+            await session.asearch_round(session.first_queries())
+            update = {"research_session": session}
+        research_span.set(cached=cached is not None)
+    await llm_ready
+    return update
+
+def research_route(state) -> str:
+    """Loop through follow-up rounds until the session's novelty or budgets say to stop."""
+    session = state.get("research_session")
+    if session is None or session.stop_reason() is not None:
+        return "done"
+    return "expand"
+
+async def expand_research_node(state):
+    """Run one round of follow-up searches and record how much new coverage it added."""
+    session = state["research_session"]
+    queries = session.next_queries()
+    with span("research.round", round=len(session.rounds) + 1, queries=len(queries)) as round_span:
+        novelty = await session.asearch_round(queries)
+        round_span.set(novelty=round(novelty, 3), sources=len(session.data))
+    return {"research_session": session}
+
+async def finish_research_node(state):
+    """Close the research session (cap and cache the sources) and checkpoint the research stage."""
+    session = state.get("research_session")
+    if session is None:
+        if state.get("research"):
+            await asyncio.to_thread(run_checkpoints.save_research, state.get("run_id"), state["research"])
+        return {}
+    research_data = check_research_result(session.finish())
+    if research_data:
+        await asyncio.to_thread(research_cache.set, research_cache_key(session.query, session.deep_research), research_data)
+        await asyncio.to_thread(run_checkpoints.save_research, state.get("run_id"), research_data)
+    return {"research": research_data, "research_session": None}
 
-# Define the draft node to use research data and update the state
-def draft_node(state):
-    """Draft a summary using research data and update the state."""
+# Define the draft nodes: plan the section prompts, draft every section in parallel, then assemble
+def prepare_draft_node(state):
+    """Build the per-section prompts and the citations from the research data."""
     research_data = state["research"]
     if not isinstance(research_data, list):
         raise Exception("Research data is not in the expected format (list required)")
-    
-    # Extract all parameters from state
-    deep_research = state.get("deep_research", False)
-    target_word_count = state.get("target_word_count", 1000)
-    writing_style = state.get("writing_style", "academic")
-    citation_format = state.get("citation_format", "APA")
-    language = state.get("language", "english")
-    
-    result = draft_tool.invoke({
-        "data": research_data,
-        "deep_research": deep_research,
-        "target_word_count": target_word_count,
-        "writing_style": writing_style,
-        "citation_format": citation_format,
-        "language": language,
-        "retries": 3,
-        "delay": 5
-    })
-    if "Error drafting response" in result:
-        raise Exception(result)
-    state["draft"] = result
-    return state
+    if not research_data:
+        raise Exception("Error drafting response: No research data provided")
+    section_plan, citations = prepare_sections(
+        research_data,
+        state.get("deep_research", False),
+        state.get("target_word_count", 1000),
+        state.get("writing_style", "academic"),
+        state.get("citation_format", "APA"),
+        state.get("language", "english"),
+        state["query"]
+    )
+    return {"section_plan": section_plan, "citations": citations}
+
+def fan_out_sections(state):
+    """Send every planned section not yet drafted to its own draft_section task; the scheduler runs them concurrently.
+
+    Sections restored from a run checkpoint are skipped; when all of them were, go straight to assemble.
+    """
+    from langgraph.types import Send
+
+    drafted = state.get("sections") or {}
+    sends = [
+        Send("draft_section", {"run_id": state.get("run_id"), "section_name": section_name, "messages": messages})
+        for section_name, messages in state["section_plan"]
+        if section_name not in drafted
+    ]
+    return sends or "assemble"
+
+async def draft_section_node(task):
+    """Draft one section (retrying only this section); failures are recorded, not raised, so the others finish."""
+    section_name = task["section_name"]
+    try:
+        _, text = await agenerate_section(section_name, task["messages"], retries=3, delay=5)
+    except Exception as e:
+        logging.error(f"Error generating section {section_name}: {str(e)}")
+        return {"failed_sections": {section_name: f"{type(e).__name__} - {str(e)}"}}
+    await asyncio.to_thread(run_checkpoints.save_section, task.get("run_id"), section_name, text)
+    return {"sections": {section_name: text}}
+
+def assemble_node(state):
+    """Join the drafted sections in canonical order and append the References block."""
+    section_names = [section_name for section_name, _ in state["section_plan"]]
+    with span("assemble", sections=len(section_names)):
+        try:
+            draft = assemble_response(
+                section_names, state.get("sections") or {}, state.get("failed_sections") or {}, state["citations"]
+            )
+        except Exception as e:
+            raise Exception(f"Error drafting response: {type(e).__name__} - {str(e)}")
+    return {"draft": draft}
+
+_app = None
+_app_lock = threading.Lock()
 
-# Initialize the graph
-workflow = Graph()
+def get_workflow():
+    """Return the compiled research workflow, building it on first use (langgraph is slow to import)."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                from langgraph.graph import END, START, StateGraph
 
-# Add nodes to the workflow
-workflow.add_node("research", research_node)
-workflow.add_node("draft", draft_node)
+                # Initialize the graph
+                workflow = StateGraph(ResearchState)
 
-# Define edges
-workflow.add_edge("research", "draft")
+                # Add nodes to the workflow
+                workflow.add_node("research", research_node)
+                workflow.add_node("expand_research", expand_research_node)
+                workflow.add_node("finish_research", finish_research_node)
+                workflow.add_node("prepare_draft", prepare_draft_node)
+                workflow.add_node("draft_section", draft_section_node)
+                workflow.add_node("assemble", assemble_node)
 
-# Set entry and finish points
-workflow.set_entry_point("research")
-workflow.set_finish_point("draft")
+                # Define edges: deep research loops over follow-up rounds while they add new coverage
+                workflow.add_edge(START, "research")
+                routes = {"expand": "expand_research", "done": "finish_research"}
+                workflow.add_conditional_edges("research", research_route, routes)
+                workflow.add_conditional_edges("expand_research", research_route, routes)
+                workflow.add_edge("finish_research", "prepare_draft")
 
-# Compile the workflow
-app = workflow.compile()
+                # Sections fan out in parallel and fan back in to assemble once all of them are done
+                workflow.add_conditional_edges("prepare_draft", fan_out_sections, ["draft_section", "assemble"])
+                workflow.add_edge("draft_section", "assemble")
+                workflow.add_edge("assemble", END)
+
+                # Compile the workflow
+                _app = workflow.compile()
+    return _app
 
 # Function to run the research system
-def run_research(query: str, deep_research: bool = False, target_word_count: int = 1000, writing_style: str = "academic", citation_format: str = "APA", language: str = "english") -> tuple:
-    """Run the research workflow and return results."""
-    input_dict = {
+async def arun_research(query: str, deep_research: bool = False, target_word_count: int = 1000, writing_style: str = "academic", citation_format: str = "APA", language: str = "english", run_id: str = None) -> tuple:
+    """Run the research workflow on the current event loop and return results.
+
+    Every stage is traced under run_id (a new id if not given) and checkpointed: calling
+    again with the same run_id and parameters continues from the last completed step.
+    """
+    params = {
         "query": query,
         "deep_research": deep_research,
         "target_word_count": target_word_count,
@@ -81,19 +240,72 @@ def run_research(query: str, deep_research: bool = False, target_word_count: int
         "citation_format": citation_format,
         "language": language
     }
+    run_id = run_id or uuid.uuid4().hex
+    input_dict = {"run_id": run_id, **params}
     
     try:
-        result = app.invoke(input_dict)
+        # Checkpoint writes are blocking SQLite calls: keep them off the loop every job shares
+        checkpoint = await asyncio.to_thread(run_checkpoints.start, run_id, params)
+        if checkpoint["draft"] is not None:
+            return checkpoint["research"], checkpoint["draft"]
+        if checkpoint["research"] is not None:
+            input_dict["research"] = checkpoint["research"]
+        if checkpoint["sections"]:
+            input_dict["sections"] = checkpoint["sections"]
+        resumed = checkpoint["research"] is not None
+        with trace_run(run_id, query=query, deep_research=deep_research, resumed=resumed):
+            # max_concurrency bounds the parallel section nodes like draft_answer's worker pool
+            result = await get_workflow().ainvoke(input_dict, {"max_concurrency": DRAFT_MAX_CONCURRENCY})
         # Ensure result is a dictionary and extract outputs
         if not isinstance(result, dict):
             raise Exception(f"Workflow returned unexpected type: {type(result)}")
         research_data = result.get("research", [])
         draft_response = result.get("draft", "Error: Draft not generated")
+        await asyncio.to_thread(run_checkpoints.finish, run_id, draft=draft_response)
         return research_data, draft_response  # Make sure we're returning both values
     except Exception as e:
-        # Return a tuple with empty list and error message instead of raising
+        # Keep the checkpoint so the run can be resumed, and return the error instead of raising
+        await asyncio.to_thread(run_checkpoints.finish, run_id, error=str(e))
         return [], f"Workflow failed: {str(e)}"  # Add this line to ensure we always return 2 values
 
+def run_sync(coroutine):
+    """Run a coroutine to completion from blocking code on a new event loop.
+
+    asyncio.run refuses to start inside a thread that already runs an event loop
+    (notebooks, async hosts), so in that case the coroutine gets its own loop on a worker thread.
+    The loop's pooled HTTP connections are closed before it finishes.
+    """
+    async def run_and_close():
+        try:
+            return await coroutine
+        finally:
+            await aclose_loop_transports()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_and_close())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-sync") as executor:
+        return executor.submit(asyncio.run, run_and_close()).result()
+
+def run_research(query: str, deep_research: bool = False, target_word_count: int = 1000, writing_style: str = "academic", citation_format: str = "APA", language: str = "english", run_id: str = None) -> tuple:
+    """Run the research workflow and return results (blocking wrapper around arun_research)."""
+    return run_sync(arun_research(query, deep_research, target_word_count, writing_style, citation_format, language, run_id))
+
+async def aresume(run_id: str) -> tuple:
+    """Continue a checkpointed run from its last completed step (the research stage, then each drafted section).
+
+    Raises KeyError if no checkpoint is stored for run_id; a finished run returns its stored result.
+    """
+    run = await asyncio.to_thread(run_checkpoints.get, run_id)
+    if run is None:
+        raise KeyError(f"No checkpoint for run {run_id}")
+    return await arun_research(**run["params"], run_id=run_id)
+
+def resume(run_id: str) -> tuple:
+    """Resume a checkpointed run (blocking wrapper around aresume)."""
+    return run_sync(aresume(run_id))
+
 # Example usage
 if __name__ == "__main__":
     query = "why sugar is bad for your health"
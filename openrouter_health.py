@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENROUTER_MODELS_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/") + "/models"
+
+# How long a probe result is trusted, and the circuit-breaker settings fed by real LLM calls
+HEALTH_TTL = float(os.getenv("OPENROUTER_HEALTH_TTL", "60"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("OPENROUTER_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("OPENROUTER_BREAKER_COOLDOWN", "30"))
+
+class OpenRouterHealth:
+    """Non-blocking OpenRouter health status.
+
+    The status is answered from a TTL-cached probe of the models endpoint; stale
+    results are refreshed on a background thread over a pooled requests.Session.
+    A circuit breaker fed by real LLM call outcomes overrides the probe: after
+    `failure_threshold` consecutive failures the breaker opens (status "down")
+    for `cooldown` seconds, then lets calls through again (half-open) until the
+    next success closes it or a failure reopens it.
+    """
+
+    def __init__(self, url: str = OPENROUTER_MODELS_URL, ttl: float = HEALTH_TTL,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.url = url
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._lock = threading.Lock()
+        self._probe_ok = None
+        self._probed_at = 0.0
+        self._refreshing = False
+        self._consecutive_failures = 0
+        self._opened_at = None
+
+    def _probe(self):
+        """Query the models endpoint and store the result (runs on a background thread)."""
+        try:
+            response = self.session.get(self.url, timeout=5)
+            ok = response.status_code == 200
+        except Exception as e:
+            logging.error(f"Failed to check OpenRouter status: {str(e)}")
+            ok = False
+        with self._lock:
+            self._probe_ok = ok
+            self._probed_at = time.monotonic()
+            self._refreshing = False
+
+    def refresh(self):
+        """Start a background probe unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._probe, name="openrouter-health", daemon=True).start()
+
+    def breaker_state(self) -> str:
+        """Return "closed", "open" or "half-open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half-open"
+
+    def status(self) -> str:
+        """Return "operational", "down" or "unknown" without waiting on the network."""
+        if self.breaker_state() == "open":
+            return "down"
+        with self._lock:
+            probe_ok = self._probe_ok
+            stale = time.monotonic() - self._probed_at > self.ttl
+        if probe_ok is None or stale:
+            self.refresh()
+        if probe_ok is None:
+            return "unknown"
+        return "operational" if probe_ok else "down"
+
+    def is_operational(self) -> bool:
+        """True unless OpenRouter is known to be down (an unknown status is not treated as down)."""
+        return self.status() != "down"
+
+    def record_success(self):
+        """Feed a successful LLM call into the circuit breaker."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        """Feed a failed (transient) LLM call into the circuit breaker."""
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._opened_at is not None or self._consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logging.warning(f"OpenRouter circuit breaker opened after {self._consecutive_failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+# Shared by the app, the exports and the drafting agent
+openrouter_health = OpenRouterHealth()
+
+def check_openrouter_status():
+    """Check if OpenRouter API is operational (cached; never blocks on the network)."""
+    return openrouter_health.is_operational()
@@ -0,0 +1,137 @@
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+
+# How often async callers waiting for a free concurrency slot re-check the limiter
+SLOT_POLL_INTERVAL = 0.05
+
+class AdaptiveRateLimiter:
+    """Client-side limiter for one upstream: a token bucket plus an AIMD concurrency limit.
+
+    The bucket allows `rate` calls per second with bursts of up to `burst`.
+    The concurrency limit grows by about one slot per window of fast successful
+    calls (additive increase) and halves when a call is throttled (HTTP 429) or
+    slower than `latency_target` (multiplicative decrease), never leaving
+    [min_concurrency, max_concurrency]. Only calls started after the last decrease
+    can trigger another one, so a wave of 429s from one burst halves it once.
+
+    The same instance is safe to share between threads (`limit`) and event loops (`alimit`).
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrency: int, min_concurrency: int = 1,
+                 latency_target: float = None, throttle_errors: tuple = ()):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.throttle_errors = throttle_errors
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+        self._slot_released = threading.Condition(self._lock)
+
+    def is_throttled(self, exc: BaseException) -> bool:
+        """True if exc means the upstream rejected the call for rate reasons."""
+        return isinstance(exc, self.throttle_errors) or getattr(exc, "status_code", None) == 429
+
+    def _try_acquire(self):
+        """Take a token and a slot (caller holds the lock); return 0 on success, else how long to wait (None: until a release)."""
+        if self.in_flight >= int(self.concurrency):
+            return None
+        # A rate of 0 disables the token bucket and only the concurrency limit applies
+        if self.rate > 0:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        self.in_flight += 1
+        self.calls += 1
+        return 0
+
+    def acquire(self) -> float:
+        """Block until a call may start; return its start time for release()."""
+        with self._slot_released:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return time.monotonic()
+                self._slot_released.wait(wait)
+
+    async def aacquire(self) -> float:
+        """Async variant of acquire that never blocks the event loop."""
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+            if wait == 0:
+                return time.monotonic()
+            await asyncio.sleep(SLOT_POLL_INTERVAL if wait is None else wait)
+
+    def release(self, started: float, outcome: str = "ok"):
+        """Finish a call started at `started`; outcome is "ok", "throttled" or "error"."""
+        latency = time.monotonic() - started
+        with self._slot_released:
+            self.in_flight -= 1
+            slow = self.latency_target is not None and latency > self.latency_target
+            if outcome == "throttled":
+                self.throttled += 1
+                # Stop the current burst as well as shrinking the window
+                self._tokens = min(self._tokens, 0.0)
+            if outcome == "throttled" or (outcome == "ok" and slow):
+                if started >= self._decreased_at and self.concurrency > self.min_concurrency:
+                    self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                    self._decreased_at = time.monotonic()
+                    logging.warning(f"{self.name} limiter: {'throttled' if outcome == 'throttled' else f'slow call ({latency:.1f}s)'}, concurrency limit now {int(self.concurrency)}")
+            elif outcome == "ok":
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._slot_released.notify_all()
+
+    def _outcome(self, exc: BaseException) -> str:
+        if exc is None:
+            return "ok"
+        return "throttled" if self.is_throttled(exc) else "error"
+
+    @contextmanager
+    def limit(self):
+        """Run the enclosed upstream call under the limiter."""
+        started = self.acquire()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.release(started, self._outcome(error))
+
+    @asynccontextmanager
+    async def alimit(self):
+        """Async variant of limit."""
+        started = await self.aacquire()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.release(started, self._outcome(error))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency_limit": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "throttled": self.throttled,
+            }
@@ -0,0 +1,290 @@
+import io
+import datetime
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from openrouter_health import check_openrouter_status
+from report_model import Report, parse_report
+from tracing import span
+
+# reportlab and python-docx are imported inside the renderers, so only processes that export pay for them
+
+BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+
+def as_report(summary):
+    """Accept either a parsed Report or raw draft text."""
+    return summary if isinstance(summary, Report) else parse_report(summary)
+
+# Function to add page numbers to the PDF
+def on_page(canvas, doc):
+    from reportlab.lib import colors
+
+    page_num = canvas.getPageNumber()
+    text = f"Page {page_num}"
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(doc.rightMargin + doc.width, doc.bottomMargin - 10, text)
+    canvas.restoreState()
+
+def format_reference_for_pdf(ref_text):
+    """Format a single reference for PDF."""
+    # Extract date and URL using regex
+    date_match = re.search(r'\(([0-9]{4},\s*[^)]+)\)', ref_text)
+    url_match = re.search(r'Retrieved from\s+(https?://\S+)', ref_text)
+    
+    if date_match and url_match:
+        date = date_match.group(1)
+        url = url_match.group(1)
+        return f"({date}). Retrieved from {url}"
+    return ref_text
+
+# Function to generate PDF with proper formatting and cover page
+def generate_pdf(query, data, summary, deep_research=False, report_date=None, openrouter_status=None):
+    """Generate a PDF report with query, data, and summary in a research paper format.
+
+    The cover page shows report_date and openrouter_status (today and the live status if not given).
+    """
+    report_date = report_date or datetime.date.today()
+    if openrouter_status is None:
+        openrouter_status = check_openrouter_status()
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        topMargin=72,
+        bottomMargin=72,
+        leftMargin=72,
+        rightMargin=72
+    )
+    styles = getSampleStyleSheet()
+
+    # Customize styles for a research paper look
+    styles['Title'].fontSize = 16
+    styles['Title'].spaceAfter = 12
+    styles['Heading2'].fontSize = 14
+    styles['Heading2'].spaceAfter = 6
+    styles['Heading3'].fontSize = 12
+    styles['Heading3'].spaceAfter = 6
+    styles['BodyText'].fontSize = 10
+    styles['BodyText'].leading = 14
+    styles['BodyText'].spaceAfter = 12
+
+    # Add a custom style for references
+    styles.add(ParagraphStyle(
+        name='Reference',
+        parent=styles['BodyText'],
+        fontSize=10,
+        leftIndent=36,
+        firstLineIndent=-36,
+        spaceAfter=12
+    ))
+
+    story = []
+
+    # Cover Page
+    story.append(Paragraph("Deep Research AI Agent Report", styles['Title']))
+    story.append(Spacer(1, 24))
+    story.append(Paragraph(f"Query: {query}", styles['Normal']))
+    story.append(Paragraph(f"Date: {report_date.strftime('%B %d, %Y')}", styles['Normal']))
+    story.append(Paragraph(f"Author: [Your Name]", styles['Normal']))
+    story.append(Spacer(1, 48))
+
+    # Metadata
+    story.append(Paragraph(f"OpenRouter Status: {'Operational' if openrouter_status else 'Down'}", styles['Normal']))
+    story.append(Spacer(1, 12))
+    mode = "Deep Research" if deep_research else "Quick Research"
+    story.append(Paragraph(f"Mode: {mode}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Research Summary Section
+    story.append(Paragraph("Research Summary", styles['Heading2']))
+    story.append(Spacer(1, 12))
+
+    # Add research data summary
+    for item in data:
+        story.append(Paragraph(f"• {item['title']}", styles['Heading3']))
+        story.append(Paragraph(item['content'], styles['BodyText']))
+        story.append(Spacer(1, 12))
+
+    # Render the parsed report sections
+    report = as_report(summary)
+    for section in report:
+        story.append(Paragraph(section.heading, styles['Heading2']))
+        story.append(Spacer(1, 12))
+        if section.heading == "Analysis":
+            # Split into smaller paragraphs for readability
+            for paragraph in section.sentence_groups():
+                story.append(Paragraph(paragraph, styles['BodyText']))
+                story.append(Spacer(1, 12))
+        elif section.heading == "Key Findings":
+            for finding in section.findings:
+                story.append(Paragraph(finding, styles['BodyText']))
+                story.append(Spacer(1, 6))
+        else:
+            for paragraph in section.paragraphs:
+                if "**" in paragraph:
+                    paragraph = BOLD_RE.sub(r"<b>\1</b>", paragraph).replace("**", "")
+                story.append(Paragraph(paragraph, styles['BodyText']))
+                story.append(Spacer(1, 12))
+    references = report.references
+
+    # Add References section at the end
+    if references:
+        story.append(Paragraph("References", styles['Heading2']))
+        story.append(Spacer(1, 12))
+        
+        for i, ref in enumerate(references, 1):
+            formatted_ref = format_reference_for_pdf(ref)
+            if formatted_ref:
+                ref_para = Paragraph(
+                    f"{i}. {formatted_ref}",
+                    styles['Reference']
+                )
+                story.append(ref_para)
+
+    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    buffer.seek(0)
+    return buffer
+
+# Function to generate Word document
+def generate_docx(query, data, summary, deep_research=False, report_date=None, openrouter_status=None):
+    """Generate a Word document with query, data, and summary (cover details as in generate_pdf)."""
+    from docx import Document
+    from docx.shared import Pt, Inches
+
+    report_date = report_date or datetime.date.today()
+    if openrouter_status is None:
+        openrouter_status = check_openrouter_status()
+
+    doc = Document()
+    doc.add_heading("Deep Research AI Agent Report", 0)
+    doc.add_paragraph(f"Query: {query}")
+    doc.add_paragraph(f"Date: {report_date.strftime('%B %d, %Y')}")
+    doc.add_paragraph(f"Author: [Your Name]")
+    doc.add_paragraph(f"OpenRouter Status: {'Operational' if openrouter_status else 'Down'}")
+    doc.add_paragraph(f"Mode: {'Deep Research' if deep_research else 'Quick Research'}")
+    
+    # Research Summary Section
+    doc.add_heading("Research Summary", level=1)
+    for item in data:
+        p = doc.add_paragraph()
+        p.add_run(f"• {item['title']}").bold = True
+        doc.add_paragraph(item['content'])
+        doc.add_paragraph(f"Source: {item['url']}")
+        doc.add_paragraph()  # Add spacing
+
+    # Render the parsed report sections
+    report = as_report(summary)
+    for section in report:
+        doc.add_heading(section.heading, level=2)
+        if section.heading == "Analysis":
+            # Split into smaller paragraphs for readability
+            for paragraph in section.sentence_groups():
+                p = doc.add_paragraph(paragraph)
+                p.paragraph_format.space_after = Pt(12)
+        elif section.heading == "Key Findings":
+            for finding in section.findings:
+                p = doc.add_paragraph(finding)
+                p.paragraph_format.space_after = Pt(6)
+        else:
+            for paragraph in section.paragraphs:
+                if "**" in paragraph:
+                    paragraph = BOLD_RE.sub(r"\1", paragraph)
+                p = doc.add_paragraph(paragraph)
+                p.paragraph_format.space_after = Pt(12)
+    references = report.references
+
+    # Add References section at the end
+    if references:
+        doc.add_heading("References", level=2)
+        
+        for i, ref in enumerate(references, 1):
+            formatted_ref = format_reference_for_pdf(ref)
+            if formatted_ref:
+                p = doc.add_paragraph()
+                p.paragraph_format.left_indent = Inches(0.5)
+                p.paragraph_format.first_line_indent = Inches(-0.5)
+                p.paragraph_format.space_after = Pt(12)
+                p.add_run(f"{i}. {formatted_ref}")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+# Bounded, process-wide cache of rendered exports shared by every session
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+EXPORT_RENDERERS = {
+    "pdf": generate_pdf,
+    "docx": generate_docx,
+}
+
+_export_cache = OrderedDict()
+_export_cache_bytes = 0
+_export_cache_lock = threading.Lock()
+_export_key_locks = {}
+
+def export_cache_key(export_format, query, data, summary, deep_research=False, report_date=None, openrouter_status=True):
+    """Content address of an export: hash of (query, research data, response, mode, format) and the cover details.
+
+    The cover page prints the render date and the OpenRouter status, so both are part
+    of the key: a cached export is never served with yesterday's date or a stale status.
+    """
+    if isinstance(summary, Report):
+        summary = summary.text
+    report_date = report_date or datetime.date.today()
+    payload = json.dumps(
+        [query, data, summary, bool(deep_research), export_format, report_date.isoformat(), bool(openrouter_status)],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def export_report(export_format, query, data, summary, deep_research=False):
+    """Render a report export on demand, reusing a cached render of identical content.
+
+    Concurrent requests for the same export wait for a single render.
+    """
+    global _export_cache_bytes
+    report_date = datetime.date.today()
+    openrouter_status = check_openrouter_status()
+    key = export_cache_key(export_format, query, data, summary, deep_research, report_date, openrouter_status)
+    with _export_cache_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+        key_lock = _export_key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        try:
+            with _export_cache_lock:
+                if key in _export_cache:
+                    _export_cache.move_to_end(key)
+                    return _export_cache[key]
+
+            with span("export", format=export_format) as export_span:
+                content = EXPORT_RENDERERS[export_format](
+                    query, data, summary, deep_research=deep_research,
+                    report_date=report_date, openrouter_status=openrouter_status
+                ).getvalue()
+                export_span.set(bytes=len(content))
+
+            with _export_cache_lock:
+                _export_cache[key] = content
+                _export_cache_bytes += len(content)
+                # Evict least recently used exports beyond the size bound
+                while _export_cache_bytes > EXPORT_CACHE_MAX_BYTES and len(_export_cache) > 1:
+                    _, evicted = _export_cache.popitem(last=False)
+                    _export_cache_bytes -= len(evicted)
+            return content
+        finally:
+            # Drop the per-key lock whether the render succeeded, failed or was served from the cache
+            with _export_cache_lock:
+                _export_key_locks.pop(key, None)
@@ -0,0 +1,73 @@
+import re
+
+# Patterns shared by every consumer of a drafted report, compiled once
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+FINDING_SPLIT_RE = re.compile(r"(?=\d+\.)")
+
+class ReportSection:
+    """One drafted section: its heading, raw paragraphs, and the pieces consumers render.
+
+    `findings` is filled for Key Findings (one entry per numbered point) and
+    `sentences` for Analysis, so renderers never re-split the text.
+    """
+    __slots__ = ("heading", "paragraphs", "findings", "sentences")
+
+    def __init__(self, heading: str, paragraphs: tuple):
+        self.heading = heading
+        self.paragraphs = paragraphs
+        self.findings = ()
+        self.sentences = ()
+        if heading == "Key Findings":
+            self.findings = tuple(
+                finding.strip()
+                for paragraph in paragraphs
+                for finding in FINDING_SPLIT_RE.split(paragraph)
+                if finding.strip()
+            )
+        elif heading == "Analysis":
+            self.sentences = tuple(SENTENCE_SPLIT_RE.split("\n".join(paragraphs)))
+
+    def sentence_groups(self, max_sentences: int = None) -> list:
+        """Group Analysis sentences into readable paragraphs (4 per group for short analyses, else 6)."""
+        if max_sentences is None:
+            max_sentences = 4 if len(self.sentences) < 15 else 6
+        groups = (
+            " ".join(self.sentences[start:start + max_sentences]).strip()
+            for start in range(0, len(self.sentences), max_sentences)
+        )
+        return [group for group in groups if group]
+
+class Report:
+    """A drafted report parsed once: ordered sections plus the reference list."""
+    __slots__ = ("text", "sections", "references")
+
+    def __init__(self, text: str, sections: tuple, references: tuple):
+        self.text = text
+        self.sections = sections
+        self.references = references
+
+    def __iter__(self):
+        return iter(self.sections)
+
+def parse_report(text: str) -> Report:
+    """Parse draft text ("**Heading**" blocks separated by blank lines) into a Report."""
+    sections = []
+    references = []
+    heading = None
+    paragraphs = []
+
+    def close_section():
+        if heading and heading != "References":
+            sections.append(ReportSection(heading, tuple(paragraphs)))
+
+    for block in text.split("\n\n"):
+        if block.startswith("**") and block.endswith("**"):
+            close_section()
+            heading = block.strip("**").rstrip(":")
+            paragraphs = []
+        elif heading == "References":
+            references.extend(ref.strip() for ref in block.split("\n") if ref.strip())
+        elif heading:
+            paragraphs.append(block)
+    close_section()
+    return Report(text, tuple(sections), tuple(references))
@@ -1,61 +1,272 @@
 import os
 import json
+import asyncio
+import logging
+import time
+import threading
+import contextvars
+from collections import Counter
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain.tools import Tool
-from tavily import TavilyClient
+from langchain_core.tools import Tool
+from tavily import AsyncTavilyClient, TavilyClient
+from tavily.errors import UsageLimitExceededError
+from source_dedup import SourceDeduplicator
+from section_retrieval import tokenize
+from rate_limiter import AdaptiveRateLimiter
+from llm_transport import LoopLocalAsyncTransport
+from tracing import span
 
 # Load environment variables from .env
 load_dotenv()
 
-# Initialize Tavily client with API key from .env
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# Tavily clients use the API key from .env (TAVILY_API_BASE_URL points them at a local stand-in)
+TAVILY_API_BASE_URL = os.getenv("TAVILY_API_BASE_URL") or None
+_tavily_clients = {}
+_tavily_clients_lock = threading.Lock()
+
+def get_tavily_client(asynchronous=False):
+    """Return the shared sync or async Tavily client, building it on first use.
+
+    Deferred so importing this module does not need TAVILY_API_KEY (the UI can start without it).
+    """
+    client = _tavily_clients.get(asynchronous)
+    if client is None:
+        with _tavily_clients_lock:
+            client = _tavily_clients.get(asynchronous)
+            if client is None:
+                if asynchronous:
+                    # The async client keeps one connection pool per event loop, since each run_research call runs its own loop
+                    client = AsyncTavilyClient(
+                        api_key=os.getenv("TAVILY_API_KEY"),
+                        api_base_url=TAVILY_API_BASE_URL,
+                        client=httpx.AsyncClient(transport=LoopLocalAsyncTransport())
+                    )
+                else:
+                    client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"), api_base_url=TAVILY_API_BASE_URL)
+                _tavily_clients[asynchronous] = client
+    return client
+
+# Shared limiter for every Tavily search made by this process (sync and async)
+tavily_limiter = AdaptiveRateLimiter(
+    "Tavily",
+    rate=float(os.getenv("TAVILY_RATE_LIMIT", "5")),
+    burst=int(os.getenv("TAVILY_BURST", "10")),
+    max_concurrency=int(os.getenv("TAVILY_MAX_CONCURRENCY", "8")),
+    latency_target=float(os.getenv("TAVILY_LATENCY_TARGET", "15")),
+    throttle_errors=(UsageLimitExceededError,)
+)
+
+# Deep research searches in rounds of follow-up queries and never keeps more than MAX_RESEARCH_ITEMS sources.
+# It stops once a round's novelty (share of new canonical URLs and new content terms) falls below the
+# threshold, or when the search call, time or round budget is spent.
+MAX_RESEARCH_ITEMS = 30
+DEEP_RESEARCH_NOVELTY_THRESHOLD = float(os.getenv("DEEP_RESEARCH_NOVELTY_THRESHOLD", "0.25"))
+DEEP_RESEARCH_MAX_CALLS = int(os.getenv("DEEP_RESEARCH_MAX_CALLS", "10"))
+DEEP_RESEARCH_MAX_SECONDS = float(os.getenv("DEEP_RESEARCH_MAX_SECONDS", "60"))
+DEEP_RESEARCH_MAX_ROUNDS = int(os.getenv("DEEP_RESEARCH_MAX_ROUNDS", "4"))  # follow-up rounds
+FOLLOW_UP_QUERIES_PER_ROUND = 3
+FOLLOW_UP_MAX_RESULTS = 10
+
+def get_variant_queries(query):
+    """List of variant queries used to broaden the search in deep research mode."""
+    return [
+        f"{query} overview OR review OR advancements OR trends",
+        f"{query} recent developments OR innovations OR breakthroughs",
+        f"{query} applications OR use cases OR impact"
+    ]
+
+def merge_results(data, dedup, results):
+    """Append Tavily results to data, skipping duplicate URLs and near-duplicate content."""
+    for r in results["results"]:
+        item = {"title": r["title"], "content": r["content"], "url": r["url"]}
+        if dedup.add(item):
+            data.append(item)
+
+def content_terms(text):
+    """Distinct content words of a text, used to measure how much new ground a search covers."""
+    return {token for token in tokenize(text) if len(token) > 3 and not token.isdigit()}
+
+class ResearchSession:
+    """State of one research run: the kept sources and the novelty of each search round.
+
+    Quick research is a single search. Deep research keeps asking follow-up queries
+    while they still add coverage: the first follow-ups broaden the query, later ones
+    pursue terms that emerged in the previous round.
+    """
+
+    def __init__(self, query, deep_research=False):
+        self.query = query
+        self.deep_research = deep_research
+        self.max_results = 30 if deep_research else 5
+        self.data = []
+        self.dedup = SourceDeduplicator()
+        self.seen_urls = set()
+        self.terms = set()
+        self.asked = {query}
+        self.calls = 0
+        self.rounds = []  # [{"queries", "results", "new_urls", "new_terms", "novelty"}, ...]
+        self.started = time.monotonic()
+        self.emerging_terms = []
+
+    def first_queries(self):
+        return [self.query]
+
+    def next_queries(self):
+        """Follow-up queries for the next round, limited by the remaining call budget."""
+        if len(self.rounds) == 1:
+            candidates = get_variant_queries(self.query)
+        else:
+            candidates = [f"{self.query} {term}" for term in self.emerging_terms]
+        queries = [candidate for candidate in candidates if candidate not in self.asked]
+        return queries[:min(FOLLOW_UP_QUERIES_PER_ROUND, DEEP_RESEARCH_MAX_CALLS - self.calls)]
+
+    def round_max_results(self, query_count):
+        """Results requested per query: the full page first, then the room left split across the round's queries."""
+        if not self.rounds:
+            return self.max_results
+        return max(1, min(FOLLOW_UP_MAX_RESULTS, -(-(MAX_RESEARCH_ITEMS - len(self.data)) // query_count)))
+
+    def record_round(self, queries, batches):
+        """Merge a round's search results (in query order) and measure its novelty."""
+        self.asked.update(queries)
+        self.calls += len(queries)
+        results = [r for batch in batches for r in batch["results"]]
+        new_urls = 0
+        for r in results:
+            key = self.dedup.url_key(r["url"])
+            if key not in self.seen_urls:
+                self.seen_urls.add(key)
+                new_urls += 1
+        round_terms = Counter()
+        for r in results:
+            round_terms.update(content_terms(r.get("content") or ""))
+        new_terms = set(round_terms) - self.terms
+        self.terms.update(round_terms)
+        for batch in batches:
+            merge_results(self.data, self.dedup, batch)
+
+        # Follow-ups pursue new terms shared by several results, most frequent first
+        query_terms = content_terms(self.query)
+        self.emerging_terms = [
+            term for term, count in round_terms.most_common()
+            if term in new_terms and term not in query_terms and count > 1
+        ]
+        url_novelty = new_urls / len(results) if results else 0.0
+        term_novelty = len(new_terms) / len(round_terms) if round_terms else 0.0
+        novelty = (url_novelty + term_novelty) / 2
+        self.rounds.append({
+            "queries": list(queries),
+            "results": len(results),
+            "new_urls": new_urls,
+            "new_terms": len(new_terms),
+            "novelty": round(novelty, 3),
+        })
+        logging.info(f"Research round {len(self.rounds)} for '{self.query}': {len(results)} results, novelty {novelty:.2f} ({len(self.data)} sources kept)")
+        return novelty
+
+    def stop_reason(self):
+        """Why searching should stop now, or None to run another round of follow-up queries."""
+        if not self.deep_research:
+            return "quick mode"
+        if len(self.data) >= MAX_RESEARCH_ITEMS:
+            return "source cap reached"
+        if len(self.rounds) > 1 and self.rounds[-1]["novelty"] < DEEP_RESEARCH_NOVELTY_THRESHOLD:
+            return "novelty below threshold"
+        if len(self.rounds) > DEEP_RESEARCH_MAX_ROUNDS:
+            return "round budget spent"
+        if self.calls >= DEEP_RESEARCH_MAX_CALLS:
+            return "call budget spent"
+        if time.monotonic() - self.started >= DEEP_RESEARCH_MAX_SECONDS:
+            return "time budget spent"
+        if not self.next_queries():
+            return "no follow-up queries left"
+        return None
+
+    def search_round(self, queries):
+        """Run one round of searches concurrently and record it."""
+        max_results = self.round_max_results(len(queries))
+        if len(queries) == 1:
+            batches = [tavily_search(queries[0], max_results)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, tavily_search, search_query, max_results)
+                    for search_query in queries
+                ]
+                batches = [future.result() for future in futures]
+        return self.record_round(queries, batches)
+
+    async def asearch_round(self, queries):
+        """Async variant of search_round."""
+        max_results = self.round_max_results(len(queries))
+        batches = await asyncio.gather(*(atavily_search(search_query, max_results) for search_query in queries))
+        return self.record_round(queries, batches)
+
+    def finish(self):
+        """Log the run and return the kept sources (capped)."""
+        data = self.data[:MAX_RESEARCH_ITEMS]
+        if self.deep_research:
+            logging.info(
+                f"Deep research for '{self.query}' stopped ({self.stop_reason()}) after {len(self.rounds)} rounds "
+                f"and {self.calls} searches in {time.monotonic() - self.started:.1f}s"
+            )
+        log_duplicates(self.query, self.dedup)
+        save_research_data(data)
+        return data
+
+def log_duplicates(query, dedup):
+    """Log how many duplicate sources the research stage dropped."""
+    if dedup.dropped_urls or dedup.dropped_near_duplicates:
+        logging.info(
+            f"Research for '{query}' dropped {dedup.dropped_urls} duplicate URLs "
+            f"and {dedup.dropped_near_duplicates} near-duplicate sources"
+        )
+
+def tavily_search(query, max_results):
+    """Run one Tavily search under the shared rate limiter."""
+    with span("tavily.search", query=query, max_results=max_results), tavily_limiter.limit():
+        return get_tavily_client().search(query, max_results=max_results)
+
+async def atavily_search(query, max_results):
+    """Async variant of tavily_search."""
+    with span("tavily.search", query=query, max_results=max_results):
+        async with tavily_limiter.alimit():
+            return await get_tavily_client(asynchronous=True).search(query, max_results=max_results)
+
+def save_research_data(data):
+    """Persist the latest research results for inspection."""
+    with open("research_data.json", "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"Fetched {len(data)} research items")
 
 def research_web(query, deep_research=False):
     """Fetch data from the web using Tavily based on a query."""
     try:
-        # Adjust max_results based on deep_research mode
-        max_results = 30 if deep_research else 5
-        data = []
-        url_set = set()
-
-        # Initial query
-        results = tavily_client.search(query, max_results=max_results)
-        initial_data = [{"title": r["title"], "content": r["content"], "url": r["url"]} for r in results["results"]]
-        for item in initial_data:
-            if item["url"] not in url_set:
-                data.append(item)
-                url_set.add(item["url"])
-
-        # If deep research mode and fewer than 20 results, try additional queries
-        if deep_research and len(data) < 20:
-            print(f"Initial query returned {len(data)} results, attempting additional queries...")
-            # List of variant queries to broaden the search
-            variant_queries = [
-                f"{query} overview OR review OR advancements OR trends",
-                f"{query} recent developments OR innovations OR breakthroughs",
-                f"{query} applications OR use cases OR impact"
-            ]
-            for variant_query in variant_queries:
-                if len(data) >= 20:
-                    break
-                results = tavily_client.search(variant_query, max_results=max_results)
-                additional_data = [{"title": r["title"], "content": r["content"], "url": r["url"]} for r in results["results"]]
-                for item in additional_data:
-                    if item["url"] not in url_set:
-                        data.append(item)
-                        url_set.add(item["url"])
-                # Limit to 30 results to avoid overwhelming the model
-                data = data[:30]
-
-        with open("research_data.json", "w") as f:
-            json.dump(data, f, indent=2)
-        print(f"Fetched {len(data)} research items")
-        return data
+        session = ResearchSession(query, deep_research)
+        session.search_round(session.first_queries())
+        # Deep research: keep following up while each round still adds new sources and terms
+        while session.stop_reason() is None:
+            session.search_round(session.next_queries())
+        return session.finish()
+    except Exception as e:
+        raise Exception(f"Research failed: {str(e)}")
+
+async def aresearch_web(query, deep_research=False):
+    """Async variant of research_web built on AsyncTavilyClient."""
+    try:
+        session = ResearchSession(query, deep_research)
+        await session.asearch_round(session.first_queries())
+        while session.stop_reason() is None:
+            await session.asearch_round(session.next_queries())
+        return session.finish()
     except Exception as e:
         raise Exception(f"Research failed: {str(e)}")
 
 research_tool = Tool(
     name="WebResearch",
     func=lambda query, deep_research=False: research_web(query, deep_research),
+    coroutine=lambda query, deep_research=False: aresearch_web(query, deep_research),
     description="Fetches data from the web based on a query. Supports deep research mode with more results."
-)
\ No newline at end of file
+)
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+
+# Durable per-run checkpoints: the research stage and every finished section of a workflow run
+RUN_CHECKPOINTS_ENABLED = os.getenv("RUN_CHECKPOINTS_ENABLED", "1") == "1"
+RUN_CHECKPOINT_DB = os.getenv("RUN_CHECKPOINT_DB", os.path.join("cache", "runs.sqlite3"))
+RUN_CHECKPOINT_TTL = float(os.getenv("RUN_CHECKPOINT_TTL", str(7 * 24 * 60 * 60)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    research TEXT,
+    draft TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    section_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, section_name)
+);
+"""
+
+class RunCheckpoints:
+    """SQLite store of workflow progress, so a crashed or failed run resumes from its last completed step.
+
+    A run is recorded with its parameters when it starts; the research stage and each
+    drafted section are committed as soon as they finish. Every call opens its own
+    connection, so the store is safe to share between threads and processes. Runs
+    untouched for longer than `ttl` seconds are deleted. Storage errors are logged and
+    never fail the run itself; it just loses its checkpoint.
+    """
+
+    def __init__(self, path: str = RUN_CHECKPOINT_DB, ttl: float = RUN_CHECKPOINT_TTL, enabled: bool = RUN_CHECKPOINTS_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.enabled = enabled
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    connection.execute("PRAGMA journal_mode = WAL")
+                    connection.executescript(SCHEMA)
+                    self._initialized = True
+        return connection
+
+    def _execute(self, sql: str, parameters=()) -> list:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def start(self, run_id: str, params: dict) -> dict:
+        """Register a run and return its checkpoint: {"research": list or None, "sections": {name: text}, "draft": str or None}.
+
+        A run id seen before with the same parameters resumes from its checkpoint (a
+        finished run returns its stored draft); with different parameters the old
+        checkpoint is dropped and the run starts over.
+        """
+        empty = {"research": None, "sections": {}, "draft": None}
+        if not self.enabled:
+            return empty
+        try:
+            return self._start(run_id, params)
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Run checkpoints unavailable for {run_id}: {str(e)}")
+            return empty
+
+    def _start(self, run_id: str, params: dict) -> dict:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        now = time.time()
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM runs WHERE updated_at < ?", (now - self.ttl,))
+            row = connection.execute("SELECT params, status, research, draft FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is not None and row[0] == payload and row[1] == "done":
+                return {"research": json.loads(row[2]) if row[2] is not None else [], "sections": {}, "draft": row[3]}
+            if row is not None and row[0] == payload:
+                sections = dict(connection.execute(
+                    "SELECT section_name, text FROM sections WHERE run_id = ?", (run_id,)
+                ).fetchall())
+                connection.execute(
+                    "UPDATE runs SET status = 'running', error = NULL, updated_at = ? WHERE run_id = ?", (now, run_id)
+                )
+                research = json.loads(row[2]) if row[2] is not None else None
+                if research is not None or sections:
+                    logging.info(f"Resuming run {run_id}: research {'restored' if research is not None else 'pending'}, {len(sections)} sections restored")
+                return {"research": research, "sections": sections, "draft": None}
+            connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            connection.execute(
+                "INSERT INTO runs (run_id, params, status, created_at, updated_at) VALUES (?, ?, 'running', ?, ?)",
+                (run_id, payload, now, now)
+            )
+        return {"research": None, "sections": {}, "draft": None}
+
+    def _write(self, run_id: str, statements: list):
+        """Run the statements in one transaction, logging instead of raising on storage errors."""
+        if not self.enabled or run_id is None:
+            return
+        try:
+            with closing(self._connect()) as connection, connection:
+                for sql, parameters in statements:
+                    connection.execute(sql, parameters)
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Failed to checkpoint run {run_id}: {str(e)}")
+
+    def save_research(self, run_id: str, research: list):
+        self._write(run_id, [(
+            "UPDATE runs SET research = ?, updated_at = ? WHERE run_id = ?",
+            (json.dumps(research, ensure_ascii=False), time.time(), run_id)
+        )])
+
+    def save_section(self, run_id: str, section_name: str, text: str):
+        now = time.time()
+        self._write(run_id, [
+            ("INSERT OR REPLACE INTO sections (run_id, section_name, text, created_at) VALUES (?, ?, ?, ?)",
+             (run_id, section_name, text, now)),
+            ("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, run_id)),
+        ])
+
+    def finish(self, run_id: str, draft: str = None, error: str = None):
+        """Mark a run done (with its draft) or failed (with the error, keeping the checkpoint for resume)."""
+        self._write(run_id, [(
+            "UPDATE runs SET status = ?, draft = ?, error = ?, updated_at = ? WHERE run_id = ?",
+            ("failed" if error else "done", draft, error, time.time(), run_id)
+        )])
+
+    def get(self, run_id: str) -> dict:
+        """Return a run's status, parameters and progress, or None if it is unknown."""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        rows = self._execute(
+            "SELECT params, status, research IS NOT NULL, error, updated_at, "
+            "(SELECT COUNT(*) FROM sections WHERE sections.run_id = runs.run_id) FROM runs WHERE run_id = ?",
+            (run_id,)
+        )
+        if not rows:
+            return None
+        params, status, has_research, error, updated_at, sections = rows[0]
+        return {
+            "run_id": run_id,
+            "params": json.loads(params),
+            "status": status,
+            "research_done": bool(has_research),
+            "sections_done": sections,
+            "error": error,
+            "updated_at": updated_at,
+        }
+
+# Module-level so every workflow run in the process shares one store
+run_checkpoints = RunCheckpoints()
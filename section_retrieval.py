@@ -0,0 +1,119 @@
+import re
+from typing import List, Dict, Any
+
+import numpy as np
+
+# Words per chunk when splitting source content for retrieval
+CHUNK_WORDS = 120
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+# Section-specific retrieval queries, combined with the research query
+SECTION_QUERIES = {
+    "Abstract": "overview objectives methodology key results significance implications",
+    "Introduction": "background history context significance motivation current challenges trends",
+    "Literature Review": "studies research prior work survey review approaches models datasets comparison",
+    "Key Findings": "results findings evidence data performance accuracy improvement shows demonstrates",
+    "Analysis": "analysis implications limitations challenges trade-offs applications impact comparison",
+    "Conclusion": "future directions recommendations outlook next steps long-term implications",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def chunk_sources(data: List[Dict[str, Any]], chunk_words: int = CHUNK_WORDS) -> List[Dict[str, Any]]:
+    """Split every source's content into chunks of about chunk_words words."""
+    chunks = []
+    for source_index, item in enumerate(data):
+        words = (item.get("content", "") or "").split()
+        for position, start in enumerate(range(0, len(words), chunk_words)):
+            chunks.append({
+                "source": source_index,
+                "position": position,
+                "text": " ".join(words[start:start + chunk_words]),
+            })
+        if not words:
+            chunks.append({"source": source_index, "position": 0, "text": item.get("title", "")})
+    return chunks
+
+class ChunkIndex:
+    """In-process BM25 index over research chunks, stored as flat NumPy term/chunk arrays."""
+
+    def __init__(self, chunks: List[Dict[str, Any]]):
+        self.chunks = chunks
+        chunk_tokens = [tokenize(chunk["text"]) for chunk in chunks]
+        rows = np.repeat(np.arange(len(chunks), dtype=np.int64), [len(tokens) for tokens in chunk_tokens])
+        self.vocabulary = {}
+        vocabulary = self.vocabulary
+        cols = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for tokens in chunk_tokens for token in tokens),
+            dtype=np.int64,
+            count=len(rows)
+        )
+
+        n_chunks = len(chunks)
+        n_terms = max(1, len(self.vocabulary))
+        pairs = rows * n_terms + cols
+        unique_pairs, term_freqs = np.unique(pairs, return_counts=True)
+        self.rows = unique_pairs // n_terms
+        self.cols = unique_pairs % n_terms
+
+        chunk_lengths = np.bincount(rows, minlength=n_chunks).astype(np.float64)
+        avg_length = chunk_lengths.mean() if n_chunks and chunk_lengths.mean() > 0 else 1.0
+        doc_freqs = np.bincount(self.cols, minlength=n_terms).astype(np.float64)
+        self.idf = np.log1p((n_chunks - doc_freqs + 0.5) / (doc_freqs + 0.5))
+
+        # Precompute the BM25 weight of every (chunk, term) posting once
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * chunk_lengths[self.rows] / avg_length)
+        self.weights = self.idf[self.cols] * term_freqs * (BM25_K1 + 1) / (term_freqs + norm)
+        self.n_chunks = n_chunks
+
+    def search(self, query: str, top_k: int) -> List[int]:
+        """Return the ids of the top_k chunks for query, best first."""
+        term_ids = [self.vocabulary[token] for token in set(tokenize(query)) if token in self.vocabulary]
+        if not term_ids or self.n_chunks == 0:
+            return list(range(min(top_k, self.n_chunks)))
+        mask = np.isin(self.cols, term_ids)
+        scores = np.bincount(self.rows[mask], weights=self.weights[mask], minlength=self.n_chunks)
+        if top_k >= self.n_chunks:
+            return list(np.argsort(-scores, kind="stable"))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        return list(top[np.argsort(-scores[top], kind="stable")])
+
+def select_section_sources(
+    index: ChunkIndex,
+    data: List[Dict[str, Any]],
+    section_name: str,
+    query: str = "",
+    top_k: int = 8
+) -> tuple:
+    """Return (items, source numbers) holding only the top-k chunks for a section.
+
+    Chunks are regrouped by source in their original order so source numbers stay stable.
+    """
+    section_query = f"{query} {SECTION_QUERIES.get(section_name, section_name)}"
+    selected = sorted(
+        (index.chunks[chunk_id] for chunk_id in index.search(section_query, top_k)),
+        key=lambda chunk: (chunk["source"], chunk["position"])
+    )
+
+    grouped = {}
+    for chunk in selected:
+        grouped.setdefault(chunk["source"], []).append(chunk["text"])
+
+    items = []
+    source_numbers = []
+    for source_index, texts in grouped.items():
+        item = data[source_index]
+        items.append({"title": item.get("title", ""), "url": item.get("url", ""), "content": " ... ".join(texts)})
+        source_numbers.append(source_index + 1)
+    return items, source_numbers
@@ -0,0 +1,110 @@
+import os
+import re
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+# Query parameters that only track the visit and never change the page
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "ocid", "amp",
+    "outputtype", "_hsenc", "_hsmi", "spm",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "itm_")
+
+# Host prefixes for mobile / AMP mirrors of the same site
+MIRROR_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+_AMP_PATH_RE = re.compile(r"(/amp)+/?$|/amp(?=/)", re.IGNORECASE)
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Whether to canonicalize URLs and the estimated content similarity treated as a near-duplicate (0 disables)
+CANONICALIZE_URLS = os.getenv("RESEARCH_CANONICALIZE_URLS", "1") == "1"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("RESEARCH_NEAR_DUPLICATE_THRESHOLD", "0.6"))
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so tracking, www/mobile/AMP mirrors and trailing slashes map to one key."""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = parts.hostname or ""
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_PATH_RE.sub("", parts.path)
+    path = re.sub(r"/{2,}", "/", path).rstrip("/")
+    path = re.sub(r"/index\.(html?|php)$", "", path, flags=re.IGNORECASE)
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+# MinHash permutations: h_i(x) = (a_i * x + b_i) mod p over 32-bit shingle hashes
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_MINHASH_A = _rng.randint(1, _MERSENNE_PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_MINHASH_B = _rng.randint(0, _MERSENNE_PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+def shingles(text: str, shingle_size: int = 3) -> set:
+    """Set of word shingles in text."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < shingle_size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+def minhash(text: str, shingle_size: int = 3) -> np.ndarray:
+    """MinHash signature of the word shingles in text."""
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, shingle_size)),
+        dtype=np.uint64
+    )
+    if hashes.size == 0:
+        return np.full(MINHASH_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint64)
+    permuted = (np.outer(hashes, _MINHASH_A) + _MINHASH_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+def estimate_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+class SourceDeduplicator:
+    """Tracks the sources kept so far and rejects exact, canonical-URL and near-duplicate content repeats."""
+
+    def __init__(self, canonicalize: bool = CANONICALIZE_URLS, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.canonicalize = canonicalize
+        self.threshold = threshold
+        self.urls = set()
+        self.signatures = []
+        self.dropped_urls = 0
+        self.dropped_near_duplicates = 0
+
+    def url_key(self, url: str) -> str:
+        return canonicalize_url(url) if self.canonicalize else url
+
+    def add(self, item: dict) -> bool:
+        """Record item and return True if it is new, or return False if it duplicates a kept source."""
+        key = self.url_key(item["url"])
+        if key in self.urls:
+            self.dropped_urls += 1
+            return False
+
+        if self.threshold > 0 and item.get("content"):
+            signature = minhash(item["content"])
+            if any(estimate_similarity(signature, kept) >= self.threshold for kept in self.signatures):
+                self.dropped_near_duplicates += 1
+                return False
+            self.signatures.append(signature)
+
+        self.urls.add(key)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self.url_key(url) in self.urls
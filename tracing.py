@@ -0,0 +1,153 @@
+"""Lightweight tracing spans for the research pipeline, exported to a local JSON-lines file.
+
+    with trace_run(query=query):             # root span, new run id
+        with span("section", section=name):  # nested under the current span
+            ...
+
+The current span is held in a context variable, so nesting follows asyncio
+tasks automatically; work handed to a thread pool must be submitted through
+contextvars.copy_context().run to stay under its parent.
+
+Summarize the recorded spans per stage (p50/p95 in milliseconds):
+    python tracing.py traces.jsonl [--run RUN_ID]
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    """One timed stage of a run."""
+    __slots__ = ("run_id", "span_id", "parent_id", "name", "attrs", "start_time", "started")
+
+    def __init__(self, name: str, run_id: str, parent_id: str = None, attrs: dict = None):
+        self.run_id = run_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs or {}
+        self.start_time = time.time()
+        self.started = time.perf_counter()
+
+    def set(self, **attrs):
+        """Attach attributes known only once the stage has run (e.g. a cache hit)."""
+        self.attrs.update(attrs)
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSON-lines file, one object per span."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+exporter = JsonlSpanExporter(TRACE_FILE)
+
+def current_run_id() -> str:
+    """Run id of the active span, or None outside a traced run."""
+    current = _current_span.get()
+    return current.run_id if current else None
+
+@contextmanager
+def _record(new_span: Span):
+    token = _current_span.set(new_span)
+    status, error = "ok", None
+    try:
+        yield new_span
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current_span.reset(token)
+        if TRACING_ENABLED:
+            exporter.export({
+                "run_id": new_span.run_id,
+                "span_id": new_span.span_id,
+                "parent_id": new_span.parent_id,
+                "name": new_span.name,
+                "start": new_span.start_time,
+                "duration_ms": round((time.perf_counter() - new_span.started) * 1000, 3),
+                "status": status,
+                "error": error,
+                "attrs": new_span.attrs,
+            })
+
+def span(name: str, **attrs):
+    """Time the enclosed block as a child of the current span (a new run if there is none)."""
+    parent = _current_span.get()
+    if parent is None:
+        return _record(Span(name, uuid.uuid4().hex, attrs=attrs))
+    return _record(Span(name, parent.run_id, parent.span_id, attrs))
+
+def trace_run(run_id: str = None, **attrs):
+    """Start the root span of a research run; every span opened inside it shares its run id."""
+    return _record(Span("run", run_id or uuid.uuid4().hex, attrs=attrs))
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+def load_spans(path: str = TRACE_FILE, run_id: str = None) -> list:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if run_id is None or record["run_id"] == run_id:
+                    spans.append(record)
+    return spans
+
+def summarize(spans: list) -> dict:
+    """Per-stage count, error count and p50/p95/max duration (ms), keyed by span name."""
+    durations = {}
+    errors = {}
+    for record in spans:
+        durations.setdefault(record["name"], []).append(record["duration_ms"])
+        errors[record["name"]] = errors.get(record["name"], 0) + (record["status"] == "error")
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "max_ms": values[-1],
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize traced pipeline stages (p50/p95 per span name).")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE, help=f"JSON-lines trace file (default: {TRACE_FILE})")
+    parser.add_argument("--run", help="only include spans of this run id")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(load_spans(args.path, args.run))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{'stage':<20} {'count':>6} {'errors':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for name, stats in summary.items():
+        print(f"{name:<20} {stats['count']:>6} {stats['errors']:>6} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())